@@ -0,0 +1,220 @@
+import os, re, time, hashlib, multiprocessing
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+
+from core import report_progress
+
+#########################
+# 활동 파일 (GPX/TCX) 가져오기
+# - 시계에서 내보낸 파일을 프로세스 풀에서 읽어 위도/경도/시각 배열로 만들고,
+#   거리와 움직인 시간, 평균 페이스, km 구간 기록을 점마다 도는 파이썬 루프 없이 NumPy 로 계산합니다.
+# - 결과는 DataManager.add_activities 로 그날의 러닝 세션에 덧붙이며, 파일 내용의 SHA-256 을 기록해 두어
+#   같은 파일을 다시 가져오면 읽지 않고 건너뜁니다.
+#########################
+ACTIVITY_EXTENSIONS = (".gpx", ".tcx")
+EARTH_RADIUS_M = 6371008.8
+# 이보다 느린 구간(약 33분/km)은 멈춰 있던 것으로 보고 움직인 시간에서 뺍니다.
+MOVING_SPEED_MS = 0.5
+SPLIT_M = 1000.0
+HASH_BLOCK_SIZE = 1024 * 1024
+# 거의 모든 GPX 는 <trkpt lat=".." lon=".."><ele/><time>..</time></trkpt> 형태이므로 트리를 만들지 않고
+# 정규식으로 한 번에 읽습니다. 시각이 없는 점이 있으면 다음 점의 <trkpt 까지 삼켜 찾은 점 수가
+# <trkpt 태그 수보다 적어지므로, 두 수가 다르면 ElementTree 로 다시 읽습니다.
+GPX_POINT = re.compile(rb'<(?:\w+:)?trkpt\s[^>]*?\blat=["\']([^"\']+)["\'][^>]*?\blon=["\']([^"\']+)["\'][^>]*>'
+                       rb'.*?<(?:\w+:)?time>\s*([^<\s]+)\s*</', re.S)
+GPX_POINT_TAG = re.compile(rb"<(?:\w+:)?trkpt[\s>/]")
+
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+def namespace(tag):
+    return tag[:tag.index("}") + 1] if tag.startswith("{") else ""
+
+def has_utc_offset(text):
+    # "2025-06-01T06:12:03+09:00" 처럼 날짜 뒤에 시간대가 붙어 있는지
+    return "+" in text[10:] or "-" in text[10:]
+
+def parse_times(texts):
+    # ISO 8601 시각 문자열 -> UNIX 초 배열. 대부분의 시계는 UTC("...Z")로 쓰므로 datetime64 로 한 번에 바꾸고,
+    # 시간대가 붙은 파일만 하나씩 읽습니다. 한 파일 안에서는 형식이 같으므로 처음과 끝만 봅니다.
+    if has_utc_offset(texts[0]) or has_utc_offset(texts[-1]):
+        return np.array([datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp() for text in texts])
+    return np.array([text.rstrip("Z") for text in texts], dtype="datetime64[ms]").astype(np.int64) / 1000.0
+
+def scan_gpx(data):
+    # 정규식으로 읽을 수 없는 파일이면 None
+    points = GPX_POINT.findall(data)
+    # 접두사가 붙은 태그(<g:trkpt)일 때만 정규식으로 셉니다.
+    tags = data.count(b"<trkpt") or len(GPX_POINT_TAG.findall(data))
+    if not points or len(points) != tags:
+        return None
+    lat, lon, times = zip(*points)
+    return lat, lon, [text.decode("ascii") for text in times]
+
+def parse_gpx(root):
+    ns = namespace(root.tag)
+    lat, lon, times = [], [], []
+    for element in root.iter(ns + "trkpt"):
+        text = element.findtext(ns + "time")
+        if text is None:
+            continue
+        lat.append(element.get("lat"))
+        lon.append(element.get("lon"))
+        times.append(text.strip())
+    return lat, lon, times
+
+def parse_tcx(root):
+    # 위치가 없는 점(실내 달리기, 신호 끊김)은 건너뜁니다.
+    ns = namespace(root.tag)
+    lat, lon, times = [], [], []
+    for element in root.iter(ns + "Trackpoint"):
+        position = element.find(ns + "Position")
+        text = element.findtext(ns + "Time")
+        if position is None or text is None:
+            continue
+        lat.append(position.findtext(ns + "LatitudeDegrees"))
+        lon.append(position.findtext(ns + "LongitudeDegrees"))
+        times.append(text.strip())
+    return lat, lon, times
+
+def read_track(file_name):
+    # (위도 배열, 경도 배열, UNIX 초 배열), 시각순
+    with open(file_name, "rb") as f:
+        data = f.read()
+    track = scan_gpx(data) if file_name.lower().endswith(".gpx") else None
+    if track is None:
+        root = ET.fromstring(data)
+        if local_name(root.tag) == "gpx":
+            track = parse_gpx(root)
+        elif local_name(root.tag) == "TrainingCenterDatabase":
+            track = parse_tcx(root)
+        else:
+            raise ValueError("GPX/TCX 파일이 아닙니다")
+    lat, lon, times = track
+    if len(times) < 2:
+        raise ValueError("시각이 있는 위치 기록이 2개 미만입니다")
+    seconds = parse_times(times)
+    order = np.argsort(seconds, kind="stable")
+    return np.asarray(lat, dtype=float)[order], np.asarray(lon, dtype=float)[order], seconds[order]
+
+def haversine_m(lat, lon):
+    # 이웃한 점 사이의 대원 거리(m) 배열 (길이 n - 1)
+    phi = np.radians(lat)
+    lam = np.radians(lon)
+    a = np.sin(np.diff(phi) / 2) ** 2 + np.cos(phi[:-1]) * np.cos(phi[1:]) * np.sin(np.diff(lam) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def track_stats(lat, lon, seconds):
+    segment_m = haversine_m(lat, lon)
+    dt = np.diff(seconds)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        moving = (dt > 0) & (segment_m / dt >= MOVING_SPEED_MS)
+    distance_m = np.concatenate(([0.0], np.cumsum(segment_m)))
+    moving_sec = np.concatenate(([0.0], np.cumsum(np.where(moving, dt, 0.0))))
+    total_m = float(distance_m[-1])
+    total_moving = float(moving_sec[-1])
+    # km 경계를 지난 시각을 누적 거리-누적 움직인 시간 곡선에서 보간해 구간 기록을 구합니다.
+    boundaries = np.arange(SPLIT_M, total_m, SPLIT_M)
+    at_boundary = np.interp(boundaries, distance_m, moving_sec)
+    split_sec = np.diff(np.concatenate(([0.0], at_boundary, [total_moving])))
+    split_km = np.full(len(split_sec), SPLIT_M / 1000)
+    split_km[-1] = (total_m - (boundaries[-1] if len(boundaries) else 0.0)) / 1000
+    splits = [{"km": round(float(km), 3), "sec": round(float(sec), 1)}
+              for km, sec in zip(split_km, split_sec) if km >= 0.01]
+    return {
+        "km": total_m / 1000,
+        "moving_sec": total_moving,
+        "elapsed_sec": float(seconds[-1] - seconds[0]),
+        "pace_sec": total_moving / (total_m / 1000) if total_m >= 10 and total_moving > 0 else None,
+        "splits": splits,
+        "points": int(len(seconds)),
+    }
+
+def summarize_activity(file_name):
+    # 프로세스 풀에서 실행됩니다. 날짜는 시작 시각을 이 컴퓨터의 시간대로 바꿔 정합니다.
+    lat, lon, seconds = read_track(file_name)
+    summary = track_stats(lat, lon, seconds)
+    started = datetime.fromtimestamp(seconds[0])
+    summary["file"] = os.path.basename(file_name)
+    summary["date"] = started.strftime("%Y-%m-%d")
+    summary["started_at"] = started.strftime("%Y-%m-%d %H:%M:%S")
+    return summary
+
+def file_hash(file_name):
+    digest = hashlib.sha256()
+    with open(file_name, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def collect_activity_files(paths):
+    # 파일과 폴더(하위 폴더 포함) 목록에서 GPX/TCX 파일만 이름순으로 모읍니다.
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in os.walk(path):
+                files.extend(os.path.join(directory, name) for name in names
+                             if name.lower().endswith(ACTIVITY_EXTENSIONS))
+        elif path.lower().endswith(ACTIVITY_EXTENSIONS):
+            files.append(path)
+    return sorted(files)
+
+def summarize_files(files, workers=None, progress=None, cancelled=lambda: False):
+    # [(파일, 요약 또는 예외)], 끝난 순서
+    started = time.perf_counter()
+    if workers == 1 or len(files) == 1:
+        results = []
+        for done, file_name in enumerate(files, start=1):
+            if cancelled():
+                break
+            try:
+                results.append((file_name, summarize_activity(file_name)))
+            except Exception as e:
+                results.append((file_name, e))
+            report_progress(progress, done, len(files), started)
+        return results
+    # Qt 가 떠 있는 앱에서도 쓰므로 fork 하지 않고 spawn 으로 자식 프로세스를 만듭니다.
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(summarize_activity, file_name): file_name for file_name in files}
+        for done, future in enumerate(as_completed(futures), start=1):
+            if cancelled():
+                for f in futures:
+                    f.cancel()
+                break
+            try:
+                results.append((futures[future], future.result()))
+            except Exception as e:
+                results.append((futures[future], e))
+            report_progress(progress, done, len(files), started)
+    return results
+
+def ingest_activities(data_manager, paths, activity_type="조깅", workers=None, progress=None, cancelled=lambda: False):
+    # 반환: {"imported": [요약], "skipped": 이미 가져온 파일 수, "errors": {파일: 오류 메시지}}
+    # 취소되면 아무것도 쓰지 않습니다.
+    known = data_manager.get_activity_hashes()
+    pending = {}
+    skipped = 0
+    for file_name in collect_activity_files(paths):
+        digest = file_hash(file_name)
+        if digest in known or digest in pending:
+            skipped += 1
+        else:
+            pending[digest] = file_name
+    hashes = {file_name: digest for digest, file_name in pending.items()}
+    imported = []
+    errors = {}
+    for file_name, result in summarize_files(list(pending.values()), workers, progress, cancelled):
+        if isinstance(result, Exception):
+            errors[file_name] = str(result)
+        else:
+            result["hash"] = hashes[file_name]
+            imported.append(result)
+    if cancelled():
+        return {"imported": [], "skipped": skipped, "errors": errors}
+    if imported:
+        data_manager.add_activities(imported, activity_type)
+    return {"imported": imported, "skipped": skipped, "errors": errors}
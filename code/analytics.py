@@ -0,0 +1,128 @@
+import numpy as np
+from datetime import date, datetime, timedelta
+
+#########################
+# 추세 분석 (NumPy 벡터 연산)
+# - logs 테이블을 한 번의 커서 순회로 읽어 날짜(ordinal) 인덱스 배열에 담고, 기록이 없는 날은 NaN 입니다.
+# - 이동 평균, 급성:만성 부하비, 아침 심박 기준 편차, 체중 추세 기울기를 일별 파이썬 루프 없이 계산합니다.
+#########################
+class MetricSeries:
+    def __init__(self, start, days):
+        self.start = start
+        self.days = days
+        self.heart_rate = np.full(days, np.nan)
+        self.weight = np.full(days, np.nan)
+        self.sleep = np.full(days, np.nan)
+        self.km = np.full(days, np.nan)
+
+    def index_of(self, d):
+        return d.toordinal() - self.start.toordinal()
+
+    def date_at(self, i):
+        return self.start + timedelta(days=int(i))
+
+def load_metrics(conn, start_date=None, end_date=None):
+    # 하루 거리는 저장 시 parse_running_training_km 으로 계산해 둔 logs.total_km 컬럼을 사용합니다.
+    query = "SELECT date, morning_heart_rate, fasting_weight, sleep_time, total_km FROM logs WHERE date IS NOT NULL"
+    params = []
+    if start_date is not None:
+        query += " AND date >= ?"
+        params.append(start_date.strftime("%Y-%m-%d"))
+    if end_date is not None:
+        query += " AND date <= ?"
+        params.append(end_date.strftime("%Y-%m-%d"))
+    rows = conn.execute(query + " ORDER BY date", params).fetchall()
+    ordinals = []
+    values = []
+    for log_date, hr, weight, sleep, km in rows:
+        try:
+            ordinals.append(datetime.strptime(log_date, "%Y-%m-%d").date().toordinal())
+        except ValueError:
+            continue
+        values.append((hr, weight, sleep, km))
+    if start_date is None:
+        start_date = date.fromordinal(ordinals[0]) if ordinals else date.today()
+    if end_date is None:
+        end_date = date.fromordinal(ordinals[-1]) if ordinals else start_date
+    series = MetricSeries(start_date, max(end_date.toordinal() - start_date.toordinal() + 1, 0))
+    if not ordinals:
+        return series
+    idx = np.asarray(ordinals) - start_date.toordinal()
+    data = np.array(values, dtype=float)  # None -> nan
+    # 0 은 입력하지 않은 값으로 저장되므로 심박/체중/수면은 0 을 결측으로 봅니다.
+    for column, target in ((0, series.heart_rate), (1, series.weight), (2, series.sleep)):
+        col = data[:, column]
+        target[idx] = np.where(col > 0, col, np.nan)
+    series.km[idx] = data[:, 3]
+    return series
+
+def rolling_sum_count(values, window):
+    # NaN 을 제외한 길이 window 의 후행 구간 합계와 개수
+    valid = ~np.isnan(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, values, 0.0))))
+    ccount = np.concatenate(([0], np.cumsum(valid)))
+    upper = np.arange(1, len(values) + 1)
+    lower = np.maximum(upper - window, 0)
+    return csum[upper] - csum[lower], ccount[upper] - ccount[lower]
+
+def rolling_mean(values, window, min_periods=1):
+    total, count = rolling_sum_count(values, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count >= min_periods, total / count, np.nan)
+
+def acute_chronic_ratio(km, acute=7, chronic=28):
+    # 기록이 없는 날은 달리지 않은 날(0km)로 봅니다.
+    load = np.nan_to_num(km, nan=0.0)
+    acute_mean = rolling_mean(load, acute)
+    chronic_mean = rolling_mean(load, chronic)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = acute_mean / chronic_mean
+    ratio[np.arange(len(load)) < chronic - 1] = np.nan
+    ratio[~np.isfinite(ratio)] = np.nan
+    return ratio
+
+def baseline_deviation(values, window=28, min_periods=7):
+    # 당일을 제외한 이전 window 일 평균 대비 편차
+    baseline = np.concatenate(([np.nan], rolling_mean(values, window, min_periods)[:-1]))
+    return values - baseline
+
+def rolling_slope(values, window=28, min_periods=7):
+    # NaN 을 제외한 후행 구간 최소제곱 기울기 (단위/일)
+    x = np.arange(len(values), dtype=float)
+    valid = ~np.isnan(values)
+    y = np.where(valid, values, 0.0)
+    xv = np.where(valid, x, 0.0)
+    n = rolling_sum_count(np.where(valid, 1.0, np.nan), window)[1]
+    sx = rolling_sum_count(np.where(valid, xv, np.nan), window)[0]
+    sy = rolling_sum_count(np.where(valid, y, np.nan), window)[0]
+    sxy = rolling_sum_count(np.where(valid, xv * y, np.nan), window)[0]
+    sxx = rolling_sum_count(np.where(valid, xv * xv, np.nan), window)[0]
+    denom = n * sxx - sx * sx
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = (n * sxy - sx * sy) / denom
+    slope[(n < min_periods) | (denom == 0)] = np.nan
+    return slope
+
+def compute_trends(series):
+    km = series.km
+    return {
+        "km_7d": rolling_mean(np.nan_to_num(km, nan=0.0), 7),
+        "km_28d": rolling_mean(np.nan_to_num(km, nan=0.0), 28),
+        "acwr": acute_chronic_ratio(km),
+        "heart_rate_7d": rolling_mean(series.heart_rate, 7),
+        "heart_rate_deviation": baseline_deviation(series.heart_rate),
+        "sleep_7d": rolling_mean(series.sleep, 7),
+        "weight_slope_per_week": rolling_slope(series.weight) * 7,
+    }
+
+def trends_between(conn, start_date, end_date, history_days=56):
+    # start_date ~ end_date 의 날짜별 추세. 이동 창을 채우기 위해 history_days 만큼 앞에서부터 읽습니다.
+    series = load_metrics(conn, start_date - timedelta(days=history_days), end_date)
+    trends = compute_trends(series)
+    first = series.index_of(start_date)
+    result = []
+    for i in range(first, series.days):
+        row = {name: (None if np.isnan(values[i]) else float(values[i])) for name, values in trends.items()}
+        row["date"] = series.date_at(i).strftime("%Y-%m-%d")
+        result.append(row)
+    return result
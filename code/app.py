@@ -1,148 +1,205 @@
-import sys, os, sqlite3, json
+import sys, os, sqlite3, json, time, threading, gzip, shutil
+# 시작 시간 측정 (TRAINING_LOG_STARTUP_TIMING=1 일 때 출력)
+startup_marks = [("start", time.perf_counter())]
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from datetime import datetime, timedelta, date
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QTextEdit, QPushButton, QRadioButton, QButtonGroup, QStackedWidget,
-    QTableWidget, QTableWidgetItem, QGroupBox, QInputDialog, QToolBar, QTimeEdit,
-    QMessageBox, QFileDialog, QCalendarWidget, QHeaderView, QComboBox
+    QTableView, QAbstractItemView, QGroupBox, QInputDialog, QToolBar, QTimeEdit,
+    QMessageBox, QFileDialog, QCalendarWidget, QHeaderView, QComboBox, QProgressDialog,
+    QListWidget, QListWidgetItem, QShortcut, QDateEdit
 )
-from PyQt5.QtGui import QFont, QIntValidator, QDoubleValidator, QPainter, QColor, QPixmap
-from PyQt5.QtCore import Qt, QTime
+from PyQt5.QtGui import (
+    QFont, QIntValidator, QDoubleValidator, QPainter, QColor, QPixmap,
+    QImage, QGuiApplication, QPdfWriter, QPageSize, QPageLayout, QKeySequence
+)
+from PyQt5.QtCore import (
+    Qt, QTime, QDate, QTimer, QThread, QObject, QAbstractTableModel, QModelIndex, QRectF, QBuffer, QIODevice, QLockFile, pyqtSignal
+)
+
+from core import (
+    profiler, traced, data_dir, connect_database, DataManager, parse_running_training_km,
+    backup_format, import_backup, export_backup, backup_dir, list_snapshots, check_integrity,
+    create_snapshot, prune_snapshots, SNAPSHOT_INTERVAL, SNAPSHOT_RETENTION, RESTORE_PAGES_PER_STEP,
+    AthleteRegistry, aggregate_team, HR_ALERT_BPM
+)
+
+# openpyxl(백업)과 analytics(numpy)는 처음 쓰일 때 불러와 첫 화면이 빨리 뜨도록 합니다.
+
+startup_marks.append(("import", time.perf_counter()))
 
-import openpyxl
+def mark_startup(stage):
+    startup_marks.append((stage, time.perf_counter()))
+
+def report_startup():
+    if os.environ.get("TRAINING_LOG_STARTUP_TIMING") != "1":
+        return
+    lines = ["[startup timing]"]
+    for (_, prev), (stage, t) in zip(startup_marks, startup_marks[1:]):
+        lines.append(f"  {stage:<12}{(t - prev) * 1000:8.1f} ms")
+    lines.append(f"  {'total':<12}{(startup_marks[-1][1] - startup_marks[0][1]) * 1000:8.1f} ms")
+    print("\n".join(lines), file=sys.stderr)
 
 #########################
-# 데이터베이스 매니저
+# 중복 실행 확인
+# - 같은 DB 를 두 앱이 동시에 쓰지 않도록 데이터 폴더에 잠금 파일을 둡니다.
 #########################
-class DataManager:
-    def __init__(self, db_path="training_log.db"):
-        self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path)
-        self.create_table()
-    
-    def create_table(self):
-        c = self.conn.cursor()
-        # 식사 시각 정보는 제거되었습니다.
-        c.execute('''CREATE TABLE IF NOT EXISTS logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT UNIQUE,
-            running_training TEXT,
-            strength_training TEXT,
-            morning_heart_rate INTEGER,
-            fasting_weight INTEGER,
-            bedtime TEXT,
-            wakeup_time TEXT,
-            sleep_time REAL,
-            bowel TEXT,
-            meal_breakfast TEXT,
-            meal_lunch TEXT,
-            meal_dinner TEXT,
-            meal_snack TEXT,
-            comment TEXT
-        )''')
-        self.conn.commit()
-    
-    def save_log(self, log):
-        c = self.conn.cursor()
-        c.execute('''
-            INSERT OR REPLACE INTO logs (
-                date, running_training, strength_training, morning_heart_rate, fasting_weight,
-                bedtime, wakeup_time, sleep_time, bowel,
-                meal_breakfast, meal_lunch, meal_dinner, meal_snack, comment
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            log['date'],
-            log['running_training'],
-            log['strength_training'],
-            log['morning_heart_rate'],
-            log['fasting_weight'],
-            log['bedtime'],
-            log['wakeup_time'],
-            log['sleep_time'],
-            log['bowel'],
-            log['meal_breakfast'],
-            log['meal_lunch'],
-            log['meal_dinner'],
-            log['meal_snack'],
-            log['comment']
-        ))
-        self.conn.commit()
-    
-    def get_log_by_date(self, log_date):
-        c = self.conn.cursor()
-        c.execute("SELECT * FROM logs WHERE date=?", (log_date,))
-        return c.fetchone()
-    
-    def get_logs_between(self, start_date, end_date):
-        c = self.conn.cursor()
-        c.execute("SELECT * FROM logs WHERE date BETWEEN ? AND ? ORDER BY date", (start_date, end_date))
-        return c.fetchall()
-    
-    def get_all_logs(self):
-        c = self.conn.cursor()
-        c.execute("SELECT * FROM logs ORDER BY date")
-        return c.fetchall()
-    
-    def get_previous_weight(self, current_date):
-        try:
-            d = datetime.strptime(current_date, "%Y-%m-%d").date()
-        except:
-            return None
-        prev_date = d - timedelta(days=1)
-        c = self.conn.cursor()
-        c.execute("SELECT fasting_weight FROM logs WHERE date=?", (prev_date.strftime("%Y-%m-%d"),))
-        result = c.fetchone()
-        return result[0] if result else None
+def acquire_instance_lock():
+    # 다른 앱 인스턴스가 같은 DB 를 쓰고 있는지 확인합니다. 잠금을 얻지 못하면 None 을 반환합니다.
+    lock = QLockFile(os.path.join(data_dir(), "training_log.lock"))
+    lock.setStaleLockTime(0)
+    if lock.tryLock(100):
+        return lock
+    return None
+
+#########################
+# 비동기 데이터 매니저
+# - 쓰기 전용 스레드 1개와 읽기 전용 연결을 가진 스레드 풀에서 DataManager 메서드를 실행합니다.
+# - 결과는 Qt 시그널로 메인 스레드에 전달되어 callback(result) 이 호출되므로 UI가 SQLite 를 기다리지 않습니다.
+# - 수치 저장소(MetricStore)도 읽기 스레드에서 만들어 넘겨받습니다. 화면 쪽은 data_manager.metrics 대신
+#   with_metrics(callback) 으로 쓰며, 저장소가 준비되기 전이면 준비된 뒤에 호출됩니다.
+#########################
+class AsyncDataManager(QObject):
+    completed = pyqtSignal(object, object)  # (callback, result)
+    failed = pyqtSignal(str)
+
+    def __init__(self, data_manager, read_workers=2):
+        super().__init__()
+        self.data_manager = data_manager
+        self.local = threading.local()
+        self.writer = ThreadPoolExecutor(max_workers=1, initializer=self.open_connection, initargs=(False,))
+        self.readers = ThreadPoolExecutor(max_workers=read_workers, initializer=self.open_connection, initargs=(True,))
+        self.completed.connect(self.deliver)
+        # shutdown 뒤에는 Qt 큐에 남은 완료 알림을 버립니다 (연결이 이미 닫혔을 수 있습니다).
+        self.closed = False
+        self.metric_waiters = []
+        self.metrics_generation = 0
+        self.data_manager.add_save_listener(self.on_data_saved)
+        self.load_metrics()
+
+    def open_connection(self, read_only):
+        # 각 작업 스레드는 자신만의 연결을 가집니다.
+        self.local.data_manager = DataManager(self.data_manager.db_path, read_only=read_only)
+
+    def read(self, method, *args, callback=None):
+        return self.submit(self.readers, method, args, callback)
+
+    def write(self, method, *args, callback=None):
+        return self.submit(self.writer, method, args, callback)
+
+    def save_log(self, log, callback=None):
+        # 쓰기가 끝나면 메인 스레드에서 저장 리스너(월간 캐시 등)에 알린 뒤 callback 을 호출합니다.
+        def on_saved(result):
+            self.data_manager.notify_saved(log['date'], log)
+            if callback:
+                callback(result)
+        return self.write("save_log", log, callback=on_saved)
+
+    def update_fields(self, log_date, fields, callback=None):
+        def on_saved(result):
+            self.data_manager.notify_saved(log_date, fields)
+            if callback:
+                callback(result)
+        return self.write("update_fields", log_date, fields, callback=on_saved)
+
+    def load_metrics(self):
+        # 늦게 도착한 이전 요청의 저장소는 버립니다.
+        self.metrics_generation += 1
+        generation = self.metrics_generation
+        self.read("build_metric_store", callback=lambda store: self.on_metrics_loaded(generation, store))
+
+    def on_metrics_loaded(self, generation, store):
+        if generation != self.metrics_generation:
+            return
+        self.data_manager.metric_store = store
+        waiters, self.metric_waiters = self.metric_waiters, []
+        for callback in waiters:
+            callback(store)
+
+    def with_metrics(self, callback):
+        store = self.data_manager.metric_store
+        if store is not None:
+            callback(store)
+        else:
+            self.metric_waiters.append(callback)
+
+    def on_data_saved(self, log_date):
+        # 여러 날이 바뀌었거나 저장소를 만드는 중에 저장되어 저장소가 비었으면 다시 만듭니다.
+        if self.data_manager.metric_store is None:
+            self.load_metrics()
+
+    def submit(self, executor, method, args, callback):
+        def task():
+            return getattr(self.local.data_manager, method)(*args)
+        future = executor.submit(task)
+        future.add_done_callback(lambda f: self.on_done(f, callback))
+        return future
+
+    def on_done(self, future, callback):
+        # 작업 스레드에서 호출되므로 시그널로만 결과를 넘깁니다.
+        if future.cancelled() or self.closed:
+            return
+        error = future.exception()
+        if error is not None:
+            self.failed.emit(str(error))
+        else:
+            self.completed.emit(callback, future.result())
+
+    def deliver(self, callback, result):
+        if callback and not self.closed:
+            callback(result)
+
+    def shutdown(self):
+        # 대기 중인 쓰기를 모두 마친 뒤 종료합니다. 쓰기는 이미 커밋되었으므로 완료 콜백(저장 리스너)은 부르지 않습니다.
+        self.closed = True
+        self.readers.shutdown(wait=True, cancel_futures=True)
+        self.writer.shutdown(wait=True)
 
 #########################
 # 러닝 트레이닝 한 줄 입력 위젯
+# - 거리(km) 입력과 m × 횟수 입력을 미리 만들어 두고 종류에 따라 보이기만 바꿉니다.
+# - 삭제해도 위젯을 지우지 않고 RunningTrainingWidget 이 다음 세션에 재사용합니다.
 #########################
 class RunningTrainingLine(QWidget):
-    def __init__(self, parent_layout):
-        super().__init__()
-        self.parent_layout = parent_layout
+    changed = pyqtSignal()
+    # 삭제 버튼을 누르면 자신을 인자로 발생합니다.
+    remove_requested = pyqtSignal(object)
 
+    def __init__(self):
+        super().__init__()
         self.type_combo = QComboBox()
         self.type_combo.addItems([
             "조깅", "지속주", "윈드 스프린트", "LSD", "가속주",
             "언덕 훈련", "인터벌", "TT", "크로스컨트리"
         ])
         self.type_combo.currentTextChanged.connect(self.update_input_fields)
+        self.type_combo.currentTextChanged.connect(self.changed)
 
-        self.input_layout = QHBoxLayout()
-        self.remove_button = QPushButton("삭제")
-        self.remove_button.clicked.connect(self.remove_self)
+        self.distance_box = QWidget()
+        distance_layout = QHBoxLayout(self.distance_box)
+        distance_layout.setContentsMargins(0, 0, 0, 0)
+        self.value_edit = QLineEdit()
+        self.value_edit.setValidator(QDoubleValidator(0.0, 1000.0, 2))
+        self.value_edit.setPlaceholderText("숫자만 (km)")
+        distance_layout.addWidget(self.value_edit)
 
-        main_layout = QHBoxLayout()
-        main_layout.addWidget(self.type_combo)
-        main_layout.addLayout(self.input_layout)
-        main_layout.addWidget(self.remove_button)
-        self.setLayout(main_layout)
-
-        self.update_input_fields(self.type_combo.currentText())
+        self.interval_box = QWidget()
+        interval_layout = QHBoxLayout(self.interval_box)
+        interval_layout.setContentsMargins(0, 0, 0, 0)
+        self.m_edit = QLineEdit()
+        self.m_edit.setValidator(QIntValidator(0, 10000))
+        self.m_edit.setPlaceholderText("거리(m)")
+        self.count_edit = QLineEdit()
+        self.count_edit.setValidator(QIntValidator(0, 1000))
+        self.count_edit.setPlaceholderText("횟수")
+        interval_layout.addWidget(self.m_edit)
+        interval_layout.addWidget(QLabel("×"))
+        interval_layout.addWidget(self.count_edit)
 
-    def update_input_fields(self, new_type):
-        while self.input_layout.count():
-            item = self.input_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-        if new_type in ["언덕 훈련", "인터벌"]:
-            self.m_edit = QLineEdit()
-            self.m_edit.setValidator(QIntValidator(0, 10000))
-            self.m_edit.setPlaceholderText("거리(m)")
-            self.count_edit = QLineEdit()
-            self.count_edit.setValidator(QIntValidator(0, 1000))
-            self.count_edit.setPlaceholderText("횟수")
-            self.input_layout.addWidget(self.m_edit)
-            self.input_layout.addWidget(QLabel("×"))
-            self.input_layout.addWidget(self.count_edit)
-        else:
-            self.value_edit = QLineEdit()
-            self.value_edit.setValidator(QDoubleValidator(0.0, 1000.0, 2))
-            self.value_edit.setPlaceholderText("숫자만 (km)")
-            self.input_layout.addWidget(self.value_edit)
         # 평균 페이스 입력란 (분, 초)
         pace_layout = QHBoxLayout()
         pace_layout.addWidget(QLabel("평균 페이스:"))
@@ -156,12 +213,42 @@ class RunningTrainingLine(QWidget):
         self.pace_sec_edit.setPlaceholderText("초")
         pace_layout.addWidget(self.pace_sec_edit)
         pace_layout.addWidget(QLabel("''"))
-        self.input_layout.addLayout(pace_layout)
 
-    def remove_self(self):
-        self.parent_layout.removeWidget(self)
-        self.setParent(None)
-        self.deleteLater()
+        for edit in [self.value_edit, self.m_edit, self.count_edit, self.pace_min_edit, self.pace_sec_edit]:
+            edit.textChanged.connect(self.changed)
+
+        self.remove_button = QPushButton("삭제")
+        self.remove_button.clicked.connect(lambda: self.remove_requested.emit(self))
+
+        main_layout = QHBoxLayout()
+        main_layout.addWidget(self.type_combo)
+        main_layout.addWidget(self.distance_box)
+        main_layout.addWidget(self.interval_box)
+        main_layout.addLayout(pace_layout)
+        main_layout.addWidget(self.remove_button)
+        self.setLayout(main_layout)
+
+        self.update_input_fields(self.type_combo.currentText())
+
+    def update_input_fields(self, new_type):
+        interval = new_type in ["언덕 훈련", "인터벌"]
+        self.interval_box.setVisible(interval)
+        self.distance_box.setVisible(not interval)
+
+    def set_session(self, d):
+        # 재사용할 때 값만 바꿔 채웁니다. 채우는 동안에는 changed 를 보내지 않습니다.
+        self.blockSignals(True)
+        try:
+            idx = self.type_combo.findText(d.get("type", ""))
+            self.type_combo.setCurrentIndex(idx if idx >= 0 else 0)
+            interval = self.type_combo.currentText() in ["언덕 훈련", "인터벌"]
+            self.value_edit.setText("" if interval else d.get("value", ""))
+            self.m_edit.setText(d.get("m", "") if interval else "")
+            self.count_edit.setText(d.get("count", "") if interval else "")
+            self.pace_min_edit.setText(d.get("pace_min", ""))
+            self.pace_sec_edit.setText(d.get("pace_sec", ""))
+        finally:
+            self.blockSignals(False)
 
     def to_dict(self):
         ttype = self.type_combo.currentText()
@@ -183,112 +270,277 @@ class RunningTrainingLine(QWidget):
 
 #########################
 # 러닝 트레이닝 그룹 위젯
+# - 한 번 만든 줄은 레이아웃에 그대로 두고, 쓰지 않는 줄은 숨겨 두었다가 다시 씁니다.
+#   날짜를 바꿔 세션 수가 줄거나 늘어도 이미 만든 줄 수 안에서는 위젯을 새로 만들지 않습니다.
 #########################
 class RunningTrainingWidget(QGroupBox):
+    # 줄 추가/삭제나 입력값이 바뀔 때마다 발생합니다 (자동 저장용).
+    changed = pyqtSignal()
+
     def __init__(self, title="러닝 트레이닝"):
         super().__init__(title)
         self.vlayout = QVBoxLayout()
         self.setLayout(self.vlayout)
+        # 레이아웃 순서대로의 줄 목록. 앞의 active_count 개만 보입니다.
+        self.lines = []
+        self.active_count = 0
         self.add_button = QPushButton("러닝 훈련 추가")
         self.add_button.clicked.connect(self.add_training_line)
         self.vlayout.addWidget(self.add_button)
 
+    def create_line(self):
+        line_widget = RunningTrainingLine()
+        line_widget.changed.connect(self.changed)
+        line_widget.remove_requested.connect(self.remove_line)
+        line_widget.hide()
+        self.vlayout.insertWidget(len(self.lines), line_widget)
+        self.lines.append(line_widget)
+
     def add_training_line(self):
-        line_widget = RunningTrainingLine(self.vlayout)
-        self.vlayout.insertWidget(self.vlayout.count()-1, line_widget)
+        if self.active_count == len(self.lines):
+            self.create_line()
+        line_widget = self.lines[self.active_count]
+        line_widget.set_session({})
+        line_widget.show()
+        self.active_count += 1
+        self.changed.emit()
+
+    def remove_line(self, line_widget):
+        # 아래 줄의 값을 한 칸씩 올리고 마지막 보이는 줄을 숨깁니다.
+        index = self.lines.index(line_widget)
+        if index >= self.active_count:
+            return
+        for i in range(index, self.active_count - 1):
+            self.lines[i].set_session(self.lines[i + 1].to_dict())
+        self.active_count -= 1
+        self.lines[self.active_count].hide()
+        self.changed.emit()
 
     def set_from_json(self, json_str):
+        # 호환용: JSON 문자열을 세션 목록으로 바꿔 set_from_sessions 에 넘깁니다.
         try:
             data = json.loads(json_str)
         except:
             data = []
-        for i in reversed(range(self.vlayout.count())):
-            item = self.vlayout.itemAt(i)
-            w = item.widget()
-            if isinstance(w, RunningTrainingLine):
-                self.vlayout.removeWidget(w)
-                w.setParent(None)
-                w.deleteLater()
-        self.vlayout.removeWidget(self.add_button)
-        for d in data:
-            line_widget = RunningTrainingLine(self.vlayout)
-            self.vlayout.insertWidget(self.vlayout.count(), line_widget)
-            if d.get("type") in line_widget.type_combo.model().stringList():
-                idx = line_widget.type_combo.findText(d["type"])
-                if idx >= 0:
-                    line_widget.type_combo.setCurrentIndex(idx)
-            if d.get("type") in ["언덕 훈련", "인터벌"]:
-                line_widget.m_edit.setText(d.get("m", ""))
-                line_widget.count_edit.setText(d.get("count", ""))
-            else:
-                line_widget.value_edit.setText(d.get("value", ""))
-            line_widget.pace_min_edit.setText(d.get("pace_min", ""))
-            line_widget.pace_sec_edit.setText(d.get("pace_sec", ""))
-        self.vlayout.addWidget(self.add_button)
-
+        self.set_from_sessions(data)
+    
+    def set_from_sessions(self, data):
+        self.setUpdatesEnabled(False)
+        try:
+            while len(self.lines) < len(data):
+                self.create_line()
+            for i, line_widget in enumerate(self.lines):
+                if i < len(data):
+                    line_widget.set_session(data[i])
+                    line_widget.show()
+                elif i < self.active_count:
+                    line_widget.hide()
+            self.active_count = len(data)
+        finally:
+            self.setUpdatesEnabled(True)
+    
+    def to_sessions(self):
+        return [line_widget.to_dict() for line_widget in self.lines[:self.active_count]]
+    
     def to_json(self):
-        lines_data = []
-        for i in range(self.vlayout.count()):
-            item = self.vlayout.itemAt(i)
-            w = item.widget()
-            if isinstance(w, RunningTrainingLine):
-                lines_data.append(w.to_dict())
-        return json.dumps(lines_data, ensure_ascii=False)
+        # 호환용: logs.running_training 컬럼에 저장되는 JSON 문자열.
+        return json.dumps(self.to_sessions(), ensure_ascii=False)
 
 #########################
-# 러닝 트레이닝 파싱 함수
+# 주간/월간 표시용 포맷 함수 (위젯과 오프스크린 렌더러가 함께 사용)
 #########################
-def parse_running_training_km(json_str):
-    try:
-        data = json.loads(json_str)
-    except:
-        data = []
-    results = []
-    total_km = 0.0
-    for item in data:
-        ttype = item.get("type", "")
-        km_val = 0.0
-        if ttype in ["언덕 훈련", "인터벌"]:
-            try:
-                m_val = float(item.get("m", "0"))
-                count = float(item.get("count", "0"))
-                km_val = (m_val * count) / 1000.0
-            except:
-                km_val = 0.0
+WEEK_FIELDS = ["러닝 트레이닝", "보강 트레이닝", "아침 심박수", "공복 몸무게",
+               "작일 취침 시각", "기상 시각", "수면 시간", "배변 여부",
+               "아침", "점심", "저녁", "간식", "코멘트"]
+
+def format_week_day(log, prev_weight=None):
+    # prev_weight: 그날 전에 마지막으로 잰 몸무게 (MetricStore.previous)
+    if not log:
+        return [""] * 13
+    run_json = log[2] if log[2] else "[]"
+    parsed_list, _ = parse_running_training_km(run_json)
+    if parsed_list:
+        run_strs = []
+        for t, km, pace in parsed_list:
+            if pace:
+                run_strs.append(f"{t} - {km:.2f}km ({pace})")
+            else:
+                run_strs.append(f"{t} - {km:.2f}km")
+        run_text = "\n".join(run_strs)
+    else:
+        run_text = ""
+    if log[5]:
+        diff = (log[5] - prev_weight) if prev_weight is not None else 0
+        if diff > 0:
+            change_str = f"(+{diff:g}kg)"
+        elif diff < 0:
+            change_str = f"(-{abs(diff):g}kg)"
         else:
-            try:
-                km_val = float(item.get("value", "0"))
-            except:
-                km_val = 0.0
-        try:
-            pace_min = int(item.get("pace_min", "0").strip()) if item.get("pace_min", "").strip() else 0
-        except:
-            pace_min = 0
-        try:
-            pace_sec = int(item.get("pace_sec", "0").strip()) if item.get("pace_sec", "").strip() else 0
-        except:
-            pace_sec = 0
-        pace_str = f"{pace_min:02d}'{pace_sec:02d}''" if (pace_min or pace_sec) else ""
-        results.append((ttype, km_val, pace_str))
-        total_km += km_val
-    return results, total_km
+            change_str = "(0kg)"
+        weight_text = f"{log[5]}kg {change_str}"
+    else:
+        weight_text = ""
+    # 식사 정보: 단순 텍스트로 표시 (식사 시각 정보 제거)
+    return [
+        run_text,
+        log[3] or "",
+        f"{log[4]} bpm" if log[4] else "",
+        weight_text,
+        log[6] or "",
+        log[7] or "",
+        f"{log[8]:.2f} 시간" if log[8] else "",
+        log[9] or "",
+        log[10] or "",
+        log[11] or "",
+        log[12] or "",
+        log[13] or "",
+        log[14] or "",
+    ]
+
+def format_week_trend(trend):
+    if not trend:
+        return ""
+    parts = []
+    if trend["km_7d"] is not None:
+        parts.append(f"7일 평균 {trend['km_7d']:.1f}km")
+    if trend["acwr"] is not None:
+        parts.append(f"부하비 {trend['acwr']:.2f}")
+    if trend["heart_rate_deviation"] is not None:
+        parts.append(f"심박 {trend['heart_rate_deviation']:+.1f}bpm")
+    if trend["weight_slope_per_week"] is not None:
+        parts.append(f"체중 {trend['weight_slope_per_week']:+.2f}kg/주")
+    return "\n".join(parts)
+
+def build_month_cell_entries(summaries, metrics):
+    # get_day_summaries_between 결과 -> {날짜: (총 거리 km, 몸무게, 몸무게 변화, 수면 시간)}
+    # 몸무게 변화는 MetricStore 에서 찾은 직전 기록과 비교합니다.
+    entries = {}
+    for log_date, total_km, weight, sleep in summaries:
+        diff = None
+        if weight:
+            prev = metrics.previous("fasting_weight", log_date)
+            diff = (weight - prev) if prev is not None else 0
+        entries[log_date] = (total_km or 0.0, weight, diff, sleep)
+    return entries
+
+def format_month_cell(entry):
+    if not entry:
+        return []
+    total_km, weight, diff, sleep = entry
+    run_val = f"{total_km:.2f}km" if total_km > 0 else ""
+    weight_val = ""
+    if weight:
+        weight_val = f"{weight}kg"
+        if diff > 0:
+            weight_val += f" (+{diff:g}kg)"
+        elif diff < 0:
+            weight_val += f" (-{abs(diff):g}kg)"
+        else:
+            weight_val += " (0kg)"
+    sleep_val = f"{sleep:.2f}시간" if sleep else ""
+    return [v for v in (run_val, weight_val, sleep_val) if v]
 
 #########################
 # CustomCalendarWidget (월간 뷰어)
 # - 셀 상단 1/3은 날짜(일자만, 볼드; 일요일 빨간, 토요일 파란), 나머지 2/3은 로그 정보를 하단/오른쪽 정렬하여 표시
+# - 그린 셀은 날짜별 QPixmap 으로 두고 (셀 크기, 화면 배율)이 같으면 다시 그리지 않습니다.
+#   기록이 바뀐 날의 셀만 버리며, 크기가 바뀌면 셀마다 새로 그립니다.
 #########################
 class CustomCalendarWidget(QCalendarWidget):
-    def __init__(self, data_manager, parent=None):
+    def __init__(self, data_manager, async_data, parent=None):
         super().__init__(parent)
         self.data_manager = data_manager
+        self.async_data = async_data
         self.setVerticalHeaderFormat(QCalendarWidget.NoVerticalHeader)
+        # 날짜 문자열 -> (총 거리 km, 몸무게, 몸무게 변화, 수면 시간)
+        self.cell_cache = {}
+        # 날짜 문자열 -> ((너비, 높이, 화면 배율), QPixmap)
+        self.cell_pixmaps = {}
+        self.cache_start = None
+        self.cache_end = None
+        self.currentPageChanged.connect(self.load_month_cache)
+        self.data_manager.add_save_listener(self.invalidate_date)
+        self.load_month_cache(self.yearShown(), self.monthShown())
+    
+    def load_month_cache(self, year, month):
+        # 화면에 보이는 최대 6주(42칸)를 한 번의 쿼리로 읽어옵니다.
+        first = date(year, month, 1)
+        self.cache_start = first - timedelta(days=14)
+        self.cache_end = first + timedelta(days=42)
+        self.cell_cache = {}
+        self.async_data.read(
+            "get_day_summaries_between",
+            self.cache_start.strftime("%Y-%m-%d"),
+            self.cache_end.strftime("%Y-%m-%d"),
+            callback=lambda logs, page=(year, month): self.apply_month_cache(page, logs))
+    
+    def apply_month_cache(self, page, logs):
+        # 응답이 오기 전에 다른 달로 넘어갔다면 버립니다.
+        if page != (self.yearShown(), self.monthShown()):
+            return
+        self.async_data.with_metrics(lambda metrics: self.fill_month_cache(page, logs, metrics))
+    
+    def fill_month_cache(self, page, logs, metrics):
+        if page != (self.yearShown(), self.monthShown()):
+            return
+        self.cell_cache = build_month_cell_entries(logs, metrics)
+        self.cell_pixmaps = {}
+        self.updateCells()
     
+    def invalidate_date(self, log_date):
+        # 저장된 날짜와, 몸무게 변화가 달라지는 다음 몸무게 기록일만 다시 계산합니다.
+        if log_date is None:
+            self.load_month_cache(self.yearShown(), self.monthShown())
+            return
+        try:
+            d = datetime.strptime(log_date, "%Y-%m-%d").date()
+        except:
+            return
+        if self.cache_start is None or not (self.cache_start <= d <= self.cache_end):
+            return
+        self.async_data.with_metrics(lambda metrics: self.reload_days(log_date, metrics))
+    
+    def reload_days(self, log_date, metrics):
+        affected = [log_date]
+        next_weight_day = metrics.next_day("fasting_weight", log_date)
+        if next_weight_day is not None and next_weight_day <= self.cache_end.strftime("%Y-%m-%d"):
+            affected.append(next_weight_day)
+        self.async_data.read(
+            "get_day_summaries_between", affected[0], affected[-1],
+            callback=lambda logs: self.async_data.with_metrics(
+                lambda metrics: self.apply_day_entries(affected, logs, metrics)))
+    
+    def apply_day_entries(self, affected, logs, metrics):
+        entries = build_month_cell_entries(logs, metrics)
+        for day_str in affected:
+            if day_str in entries:
+                self.cell_cache[day_str] = entries[day_str]
+            else:
+                self.cell_cache.pop(day_str, None)
+            self.cell_pixmaps.pop(day_str, None)
+        self.updateCells()
+    
+    @traced("CustomCalendarWidget.paintCell")
     def paintCell(self, painter, rect, date):
-        painter.save()
+        day_str = date.toString("yyyy-MM-dd")
+        key = (rect.width(), rect.height(), painter.device().devicePixelRatioF())
+        cached = self.cell_pixmaps.get(day_str)
+        if cached is None or cached[0] != key:
+            cached = (key, self.render_cell(date, day_str, key, painter.font()))
+            self.cell_pixmaps[day_str] = cached
+        painter.drawPixmap(rect.topLeft(), cached[1])
+    
+    def render_cell(self, date, day_str, key, base_font):
+        width, height, ratio = key
+        pixmap = QPixmap(max(round(width * ratio), 1), max(round(height * ratio), 1))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        rect = QRectF(0, 0, width, height).toRect()
         dow = date.dayOfWeek()  # 1=월 ... 7=일
         date_area_height = int(rect.height() * (1/3))
         date_rect = rect.adjusted(0, 0, 0, -rect.height()+date_area_height)
-        font = painter.font()
+        font = QFont(base_font)
         font.setBold(True)
         painter.setFont(font)
         if dow == 7:
@@ -297,58 +549,96 @@ class CustomCalendarWidget(QCalendarWidget):
             painter.setPen(Qt.blue)
         else:
             painter.setPen(Qt.black)
-        day_str = date.toString("d")
-        painter.drawText(date_rect, Qt.AlignCenter, day_str)
+        painter.drawText(date_rect, Qt.AlignCenter, date.toString("d"))
         
         log_rect = rect.adjusted(2, date_area_height, -2, -2)
-        log = self.data_manager.get_log_by_date(date.toString("yyyy-MM-dd"))
-        if log:
-            run_json = log[2] if log[2] else "[]"
-            _, total_km = parse_running_training_km(run_json)
-            run_val = f"{total_km:.2f}km" if total_km > 0 else ""
-            weight_val = ""
-            if log[5]:
-                weight_val = f"{log[5]}kg"
-                prev = self.data_manager.get_previous_weight(date.toString("yyyy-MM-dd"))
-                diff = (log[5] - prev) if prev is not None else 0
-                if diff > 0:
-                    weight_val += f" (+{diff}kg)"
-                elif diff < 0:
-                    weight_val += f" (-{abs(diff)}kg)"
-                else:
-                    weight_val += " (0kg)"
-            sleep_val = f"{log[8]:.2f}시간" if log[8] else ""
-            values = []
-            if run_val:
-                values.append(run_val)
-            if weight_val:
-                values.append(weight_val)
-            if sleep_val:
-                values.append(sleep_val)
-            if values:
-                painter.setPen(Qt.black)
-                font2 = painter.font()
-                font2.setBold(False)
-                painter.setFont(font2)
-                text_to_draw = "\n".join(values)
-                painter.drawText(log_rect, Qt.AlignRight | Qt.AlignBottom | Qt.TextWordWrap, text_to_draw)
-        painter.restore()
+        values = format_month_cell(self.cell_cache.get(day_str))
+        if values:
+            painter.setPen(Qt.black)
+            font.setBold(False)
+            painter.setFont(font)
+            painter.drawText(log_rect, Qt.AlignRight | Qt.AlignBottom | Qt.TextWordWrap, "\n".join(values))
+        painter.end()
+        return pixmap
 
 #########################
 # DailyLogWidget (일간 입력 화면)
 # - 러닝 트레이닝은 RunningTrainingWidget 사용
+# - 입력이 멈추면 바뀐 칸만 자동 저장합니다 (DataManager.update_fields).
+# - 이전/다음/날짜 선택으로 다른 날의 기록을 불러오며, 불러온 기록은 DayRecordCache 에 두고
+#   앞뒤 PREFETCH_DAYS 일을 백그라운드에서 미리 읽어 옵니다.
+#   캐시에 없는 날은 입력란을 잠가 두었다가 읽기가 끝나면 채우므로, 날짜를 넘길 때도 화면이 SQLite 를 기다리지 않습니다.
 #########################
+AUTOSAVE_DELAY_MS = 1500
+DAY_CACHE_SIZE = 42
+PREFETCH_DAYS = 3
+
+class DayRecordCache:
+    # 날짜 문자열 -> get_day_records 의 기록 dict (기록이 없는 날은 None) 의 LRU 캐시
+    def __init__(self, capacity=DAY_CACHE_SIZE):
+        self.capacity = capacity
+        self.records = OrderedDict()
+        # 무효화될 때마다 올려서, 그 전에 요청한 미리 읽기 결과를 버릴 수 있게 합니다.
+        self.version = 0
+
+    def __contains__(self, day_str):
+        return day_str in self.records
+
+    def get(self, day_str):
+        self.records.move_to_end(day_str)
+        return self.records[day_str]
+
+    def put(self, day_str, record):
+        self.records[day_str] = record
+        self.records.move_to_end(day_str)
+        while len(self.records) > self.capacity:
+            self.records.popitem(last=False)
+
+    def invalidate(self, day_str=None):
+        self.version += 1
+        if day_str is None:
+            self.records.clear()
+        else:
+            self.records.pop(day_str, None)
+
 class DailyLogWidget(QWidget):
-    def __init__(self, data_manager, switch_to_weekly_callback):
+    def __init__(self, data_manager, async_data, switch_to_weekly_callback):
         super().__init__()
         self.data_manager = data_manager
+        self.async_data = async_data
         self.switch_to_weekly_callback = switch_to_weekly_callback
+        self.current_date = None
+        self.loading = False
+        self.record_saved = False
+        self.cache = DayRecordCache()
+        self.data_manager.add_save_listener(self.on_data_saved)
         self.initUI()
     
     def initUI(self):
         layout = QVBoxLayout()
-        self.current_date = date.today().strftime("%Y-%m-%d")
-        layout.addWidget(QLabel(f"날짜: {self.current_date}"))
+        
+        nav_layout = QHBoxLayout()
+        self.prev_button = QPushButton("◀")
+        self.prev_button.clicked.connect(lambda: self.step_date(-1))
+        nav_layout.addWidget(self.prev_button)
+        nav_layout.addWidget(QLabel("날짜:"))
+        self.date_edit = QDateEdit()
+        self.date_edit.setCalendarPopup(True)
+        self.date_edit.setDisplayFormat("yyyy-MM-dd (ddd)")
+        self.date_edit.dateChanged.connect(lambda d: self.show_date(d.toString("yyyy-MM-dd")))
+        nav_layout.addWidget(self.date_edit)
+        self.next_button = QPushButton("▶")
+        self.next_button.clicked.connect(lambda: self.step_date(1))
+        nav_layout.addWidget(self.next_button)
+        self.today_button = QPushButton("오늘")
+        self.today_button.clicked.connect(lambda: self.show_date(date.today().strftime("%Y-%m-%d")))
+        nav_layout.addWidget(self.today_button)
+        nav_layout.addStretch()
+        layout.addLayout(nav_layout)
+        for key, step in (("Alt+Left", -1), ("Alt+Right", 1)):
+            shortcut = QShortcut(QKeySequence(key), self)
+            shortcut.setContext(Qt.WidgetWithChildrenShortcut)
+            shortcut.activated.connect(lambda step=step: self.step_date(step))
         
         self.running_training_widget = RunningTrainingWidget("러닝 트레이닝")
         layout.addWidget(self.running_training_widget)
@@ -448,11 +738,133 @@ class DailyLogWidget(QWidget):
         self.comment.setPlaceholderText("코멘트 입력")
         layout.addWidget(self.comment)
         
+        save_layout = QHBoxLayout()
+        self.autosave_label = QLabel("")
+        save_layout.addWidget(self.autosave_label)
         self.save_button = QPushButton("저장")
         self.save_button.clicked.connect(self.save_log)
-        layout.addWidget(self.save_button)
+        save_layout.addWidget(self.save_button)
+        layout.addLayout(save_layout)
         
         self.setLayout(layout)
+        
+        # 자동 저장: 날짜를 불러온 직후의 값(saved_fields)과 비교해 바뀐 칸만 씁니다.
+        self.saved_fields = {}
+        self.autosave_timer = QTimer(self)
+        self.autosave_timer.setSingleShot(True)
+        self.autosave_timer.setInterval(AUTOSAVE_DELAY_MS)
+        self.autosave_timer.timeout.connect(self.autosave)
+        self.running_training_widget.changed.connect(self.schedule_autosave)
+        for edit in [self.strength_training, self.comment]:
+            edit.textChanged.connect(self.schedule_autosave)
+        for edit in [self.morning_heart_rate, self.fasting_weight,
+                     self.meal_breakfast, self.meal_lunch, self.meal_dinner, self.meal_snack]:
+            edit.textChanged.connect(self.schedule_autosave)
+        self.bedtime.timeChanged.connect(self.schedule_autosave)
+        self.wakeup_time.timeChanged.connect(self.schedule_autosave)
+        self.bowel_group.buttonClicked.connect(self.schedule_autosave)
+        self.show_date(date.today().strftime("%Y-%m-%d"))
+    
+    def step_date(self, days):
+        day = datetime.strptime(self.current_date, "%Y-%m-%d").date() + timedelta(days=days)
+        self.show_date(day.strftime("%Y-%m-%d"))
+    
+    def show_date(self, day_str):
+        if day_str == self.current_date:
+            return
+        # 떠나는 날의 입력을 먼저 저장합니다.
+        if self.current_date is not None:
+            self.autosave()
+        self.current_date = day_str
+        self.date_edit.blockSignals(True)
+        self.date_edit.setDate(QDate.fromString(day_str, "yyyy-MM-dd"))
+        self.date_edit.blockSignals(False)
+        if day_str in self.cache:
+            self.populate(self.cache.get(day_str))
+        else:
+            # 캐시에 없으면 입력란을 잠가 두고, 앞뒤 날짜와 함께 읽어 온 뒤 on_prefetched 에서 채웁니다.
+            self.begin_loading()
+        self.prefetch_around(day_str)
+    
+    def begin_loading(self):
+        # 읽는 동안에는 이전 날의 값이 남은 폼이 새 날짜로 자동 저장되지 않도록 막습니다.
+        self.loading = True
+        self.autosave_timer.stop()
+        self.set_form_enabled(False)
+        self.autosave_label.setText("불러오는 중...")
+    
+    def set_form_enabled(self, enabled):
+        for widget in (self.running_training_widget, self.strength_training, self.morning_heart_rate,
+                       self.fasting_weight, self.bedtime, self.wakeup_time, self.bowel_o, self.bowel_x,
+                       self.meal_breakfast, self.meal_lunch, self.meal_dinner, self.meal_snack,
+                       self.comment, self.save_button):
+            widget.setEnabled(enabled)
+    
+    def prefetch_around(self, day_str):
+        center = datetime.strptime(day_str, "%Y-%m-%d").date()
+        days = [(center + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(-PREFETCH_DAYS, PREFETCH_DAYS + 1)]
+        if all(day in self.cache for day in days):
+            return
+        version = self.cache.version
+        self.async_data.read("get_day_records", days[0], days[-1],
+                             callback=lambda records: self.on_prefetched(days, records, version))
+    
+    def on_prefetched(self, days, records, version):
+        if version != self.cache.version:
+            # 읽는 사이에 저장된 날이 있으면 오래된 결과이므로, 아직 채우지 못한 날짜를 다시 읽습니다.
+            if self.current_date not in self.cache:
+                self.prefetch_around(self.current_date)
+            return
+        by_date = {record["date"]: record for record in records}
+        for day in days:
+            if day not in self.cache:
+                self.cache.put(day, by_date.get(day))
+        if self.loading and self.current_date in self.cache:
+            self.populate(self.cache.get(self.current_date))
+    
+    def on_data_saved(self, log_date):
+        self.cache.invalidate(log_date)
+        if log_date is None and self.current_date is not None:
+            # 백업 불러오기/복원처럼 여러 날이 바뀌면 지금 날짜를 다시 불러옵니다.
+            self.begin_loading()
+            self.prefetch_around(self.current_date)
+    
+    def populate(self, record):
+        # 채우는 동안에는 자동 저장을 막고, 다 채운 뒤의 값을 저장된 값으로 봅니다.
+        # 기록이 없는 날은 폼의 기본값(취침/기상 시각 등)이 DB 에 없으므로 첫 저장 때 모든 칸을 씁니다.
+        self.record_saved = bool(record)
+        record = record or {}
+        self.loading = True
+        try:
+            self.running_training_widget.set_from_sessions(record.get("sessions", []))
+            self.strength_training.setPlainText(record.get("strength_training") or "")
+            self.morning_heart_rate.setText(str(record["morning_heart_rate"]) if record.get("morning_heart_rate") else "")
+            self.fasting_weight.setText(str(record["fasting_weight"]) if record.get("fasting_weight") else "")
+            for edit, key in ((self.bedtime, "bedtime"), (self.wakeup_time, "wakeup_time")):
+                t = QTime.fromString(record.get(key) or "", "HH:mm")
+                edit.setTime(t if t.isValid() else QTime.currentTime())
+            bowel = record.get("bowel") or ""
+            self.bowel_group.setExclusive(False)
+            self.bowel_o.setChecked(bowel == "O")
+            self.bowel_x.setChecked(bowel == "X")
+            self.bowel_group.setExclusive(True)
+            self.meal_breakfast.setText(record.get("meal_breakfast") or "")
+            self.meal_lunch.setText(record.get("meal_lunch") or "")
+            self.meal_dinner.setText(record.get("meal_dinner") or "")
+            self.meal_snack.setText(record.get("meal_snack") or "")
+            self.comment.setPlainText(record.get("comment") or "")
+        finally:
+            self.loading = False
+        self.set_form_enabled(True)
+        self.autosave_timer.stop()
+        self.saved_fields = {k: v for k, v in self.collect_log().items() if k != 'date'}
+        self.autosave_label.setText("")
+    
+    def remember_form(self, log):
+        # 쓰기가 끝나기 전에 이 날짜로 돌아와도 방금 입력한 값이 보이도록 캐시에 넣어 둡니다.
+        record = dict(log)
+        record["sessions"] = self.running_training_widget.to_sessions()
+        self.cache.put(log['date'], record)
     
     def compute_sleep_time(self):
         b_time = self.bedtime.time()
@@ -463,6 +875,9 @@ class DailyLogWidget(QWidget):
         self.sleep_time_display.setText(f"{duration/60.0:.2f} 시간")
     
     def update_weight_change(self):
+        self.async_data.with_metrics(self.show_weight_change)
+    
+    def show_weight_change(self, metrics):
         current_text = self.fasting_weight.text()
         if not current_text:
             self.weight_change_label.setText("")
@@ -472,16 +887,16 @@ class DailyLogWidget(QWidget):
         except:
             self.weight_change_label.setText("")
             return
-        prev = self.data_manager.get_previous_weight(self.current_date)
+        prev = metrics.previous("fasting_weight", self.current_date)
         diff = (current_weight - prev) if prev is not None else 0
         if diff > 0:
-            self.weight_change_label.setText(f"(+{diff}kg)")
+            self.weight_change_label.setText(f"(+{diff:g}kg)")
         elif diff < 0:
-            self.weight_change_label.setText(f"(-{abs(diff)}kg)")
+            self.weight_change_label.setText(f"(-{abs(diff):g}kg)")
         else:
             self.weight_change_label.setText("(0kg)")
     
-    def save_log(self):
+    def collect_log(self):
         log = {}
         log['date'] = self.current_date
         log['running_training'] = self.running_training_widget.to_json()
@@ -509,146 +924,779 @@ class DailyLogWidget(QWidget):
         log['meal_dinner'] = self.meal_dinner.text()
         log['meal_snack'] = self.meal_snack.text()
         log['comment'] = self.comment.toPlainText()
-        self.data_manager.save_log(log)
+        return log
+    
+    def schedule_autosave(self):
+        # 입력이 멈춘 뒤 AUTOSAVE_DELAY_MS 가 지나면 바뀐 칸만 저장합니다.
+        if self.loading:
+            return
+        self.autosave_timer.start()
+    
+    def autosave(self):
+        self.autosave_timer.stop()
+        if self.loading:
+            return
+        current = self.collect_log()
+        dirty = {k: v for k, v in current.items() if k != 'date' and self.saved_fields.get(k) != v}
+        if not dirty:
+            return
+        if not self.record_saved:
+            dirty = {k: v for k, v in current.items() if k != 'date'}
+            self.record_saved = True
+        self.saved_fields.update(dirty)
+        self.remember_form(current)
+        self.autosave_label.setText("저장 중...")
+        self.async_data.update_fields(self.current_date, dirty, callback=self.on_autosaved)
+    
+    def on_autosaved(self, _):
+        self.autosave_label.setText(f"자동 저장됨 {datetime.now().strftime('%H:%M:%S')}")
+    
+    def save_log(self):
+        self.autosave_timer.stop()
+        log = self.collect_log()
+        self.saved_fields = {k: v for k, v in log.items() if k != 'date'}
+        self.record_saved = True
+        self.remember_form(log)
+        self.save_button.setEnabled(False)
+        self.async_data.save_log(log, callback=self.on_log_saved)
+    
+    def on_log_saved(self, _):
+        self.save_button.setEnabled(not self.loading)
         QMessageBox.information(self, "저장 완료", "훈련 일지가 저장되었습니다.")
         self.switch_to_weekly_callback()
 
 #########################
 # WeeklyLogWidget (주간 뷰어)
-# - 총 13행: 0: 러닝, 1: 보강, 2: 아침 심박수, 3: 공복 몸무게, 4: 작일 취침, 5: 기상, 6: 수면, 7: 배변,
-#   8: 아침, 9: 점심, 10: 저녁, 11: 간식, 12: 코멘트.
+# - 행은 날짜(맨 위가 이번 주 일요일, 아래로 갈수록 과거), 열은 WEEK_FIELDS 13칸과 추세입니다.
+# - WeekLogModel 이 한 주(7행)씩 블록으로 비동기 조회하고, 최근에 본 WEEK_BLOCK_CACHE_SIZE 개 블록만 둡니다.
+#   끝까지 스크롤하면 fetchMore 로 과거 주를 이어 붙이므로 몇 년치를 넘겨 봐도 메모리가 일정합니다.
 # - 식사 정보는 단순 텍스트로 표시합니다.
 #########################
+WEEK_BLOCK_CACHE_SIZE = 16
+WEEKS_PER_FETCH = 8
+WEEK_ROW_HEIGHT = 56
+
+class WeekLogModel(QAbstractTableModel):
+    def __init__(self, data_manager, async_data):
+        super().__init__()
+        self.data_manager = data_manager
+        self.async_data = async_data
+        self.headers = WEEK_FIELDS + ["추세"]
+        self.shade = QColor(244, 246, 250)
+        # 주 번호(0 = top 이 속한 주) -> 7개 날짜의 셀 텍스트 목록
+        self.blocks = OrderedDict()
+        self.pending = set()
+        # 무효화될 때마다 올려서, 그 전에 요청한 블록 응답을 버립니다.
+        self.generation = 0
+        # 가장 오래된 기록 날짜 (fetchMore 가 멈출 곳). 저장 때마다 조회하지 않도록 들고 있다가 저장된 날짜로 고칩니다.
+        self.first_date = None
+        self.reset_top(date.today())
+        self.load_first_date()
+
+    def reset_top(self, day):
+        self.beginResetModel()
+        self.top = day + timedelta(days=6 - day.weekday())
+        self.rows = 7 * WEEKS_PER_FETCH
+        self.drop_blocks()
+        self.endResetModel()
+
+    def drop_blocks(self):
+        self.generation += 1
+        self.blocks.clear()
+        self.pending.clear()
+
+    def load_first_date(self):
+        self.async_data.read("get_first_log_date", callback=self.apply_first_date)
+
+    def apply_first_date(self, first):
+        self.first_date = datetime.strptime(first, "%Y-%m-%d").date() if first else None
+
+    def date_at(self, row):
+        return self.top - timedelta(days=row)
+
+    def row_of(self, day):
+        return (self.top - day).days
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.first_date is None:
+            return False
+        return self.date_at(self.rows - 1) > self.first_date
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        needed = (self.row_of(self.first_date) // 7 + 1) * 7
+        self.insert_rows(min(self.rows + 7 * WEEKS_PER_FETCH, needed))
+
+    def insert_rows(self, rows):
+        if rows <= self.rows:
+            return
+        self.beginInsertRows(QModelIndex(), self.rows, rows - 1)
+        self.rows = rows
+        self.endInsertRows()
+
+    def ensure_date(self, day):
+        # day 가 들어 있는 주까지 행을 늘립니다. 미래 주이면 그 주를 맨 위로 다시 잡습니다.
+        if day > self.top:
+            self.reset_top(day)
+        self.insert_rows((self.row_of(day) // 7 + 1) * 7)
+        return self.row_of(day)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.headers[section]
+        day = self.date_at(section)
+        return f"{day.strftime('%Y-%m-%d')} ({WEEKDAY_NAMES[day.weekday()]})"
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.BackgroundRole:
+            # 주마다 배경을 번갈아 칠해 주 단위가 보이도록 합니다.
+            return self.shade if (row // 7) % 2 else None
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        block = self.block(row // 7)
+        if block is None:
+            return "" if role == Qt.DisplayRole else None
+        return block[row % 7][index.column()]
+
+    def block(self, week):
+        block = self.blocks.get(week)
+        if block is not None:
+            self.blocks.move_to_end(week)
+            return block
+        if week not in self.pending:
+            self.pending.add(week)
+            sunday = self.date_at(7 * week)
+            monday = sunday - timedelta(days=6)
+            generation = self.generation
+            self.async_data.read(
+                "get_week_block", monday.strftime("%Y-%m-%d"), sunday.strftime("%Y-%m-%d"),
+                callback=lambda result: self.apply_block(generation, week, result))
+        return None
+
+    def apply_block(self, generation, week, result):
+        self.async_data.with_metrics(lambda metrics: self.fill_block(generation, week, result, metrics))
+
+    @traced("WeekLogModel.fill_block")
+    def fill_block(self, generation, week, result, metrics):
+        if generation != self.generation:
+            return
+        self.pending.discard(week)
+        logs, trends = result
+        logs_by_date = {log[1]: log for log in logs}
+        trends_by_date = {t["date"]: t for t in trends}
+        block = []
+        for offset in range(7):
+            day_str = self.date_at(7 * week + offset).strftime("%Y-%m-%d")
+            texts = format_week_day(logs_by_date.get(day_str), metrics.previous("fasting_weight", day_str))
+            block.append(texts + [format_week_trend(trends_by_date.get(day_str))])
+        self.blocks[week] = block
+        while len(self.blocks) > WEEK_BLOCK_CACHE_SIZE:
+            self.blocks.popitem(last=False)
+        self.dataChanged.emit(self.index(7 * week, 0), self.index(7 * week + 6, len(self.headers) - 1))
+
+    def invalidate(self, log_date):
+        # 저장 리스너. 몸무게 변화와 이동 평균은 뒤의 날짜에도 영향을 주므로 블록을 모두 버리고,
+        # 화면에 보이는 블록만 다시 읽히도록 합니다.
+        self.drop_blocks()
+        if log_date is None:
+            # 여러 날이 바뀌었으면(불러오기/복원) 가장 오래된 날짜를 다시 읽습니다.
+            self.load_first_date()
+        else:
+            saved = datetime.strptime(log_date, "%Y-%m-%d").date()
+            if self.first_date is None or saved < self.first_date:
+                self.first_date = saved
+        if self.rows:
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rows - 1, len(self.headers) - 1))
+
 class WeeklyLogWidget(QWidget):
-    def __init__(self, data_manager):
+    def __init__(self, data_manager, async_data):
         super().__init__()
         self.data_manager = data_manager
+        self.async_data = async_data
+        self.model = WeekLogModel(data_manager, async_data)
+        self.data_manager.add_save_listener(self.model.invalidate)
         self.initUI()
     
     def initUI(self):
         layout = QVBoxLayout()
-        self.table = QTableWidget(13, 7)
-        self.table.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        self.table.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        today = date.today()
-        monday = today - timedelta(days=today.weekday())
-        dates = [(monday + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
-        self.table.setHorizontalHeaderLabels(dates)
-        fields = ["러닝 트레이닝", "보강 트레이닝", "아침 심박수", "공복 몸무게",
-                  "작일 취침 시각", "기상 시각", "수면 시간", "배변 여부",
-                  "아침", "점심", "저녁", "간식", "코멘트"]
-        self.table.setVerticalHeaderLabels(fields)
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        for r in range(13):
-            if r in [0, 1]:
-                self.table.verticalHeader().setSectionResizeMode(r, QHeaderView.Stretch)
-            else:
-                self.table.verticalHeader().setSectionResizeMode(r, QHeaderView.Fixed)
-                self.table.setRowHeight(r, 40)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setWordWrap(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        # 행 높이를 고정해 두면 스크롤할 때 보이지 않는 행의 내용을 잴 필요가 없습니다.
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(WEEK_ROW_HEIGHT)
+        header = self.table.horizontalHeader()
+        header.setDefaultSectionSize(90)
+        for column in [0, 1, len(WEEK_FIELDS) - 1, len(WEEK_FIELDS)]:
+            header.resizeSection(column, 200)
         layout.addWidget(self.table)
         self.setLayout(layout)
-        self.load_week_data()
-    
-    def load_week_data(self):
-        for r in range(self.table.rowCount()):
-            for c in range(self.table.columnCount()):
-                self.table.setItem(r, c, QTableWidgetItem(""))
-        today = date.today()
-        monday = today - timedelta(days=today.weekday())
-        dates = [(monday + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
-        for col, day_str in enumerate(dates):
-            log = self.data_manager.get_log_by_date(day_str)
-            if log:
-                run_json = log[2] if log[2] else "[]"
-                parsed_list, _ = parse_running_training_km(run_json)
-                if parsed_list:
-                    run_strs = []
-                    for t, km, pace in parsed_list:
-                        if pace:
-                            run_strs.append(f"{t} - {km:.2f}km ({pace})")
-                        else:
-                            run_strs.append(f"{t} - {km:.2f}km")
-                    run_text = "\n".join(run_strs)
-                else:
-                    run_text = ""
-                self.table.setItem(0, col, QTableWidgetItem(run_text))
-                self.table.setItem(1, col, QTableWidgetItem(log[3] or ""))
-                self.table.setItem(2, col, QTableWidgetItem(f"{log[4]} bpm" if log[4] else ""))
-                if log[5]:
-                    prev = self.data_manager.get_previous_weight(day_str)
-                    diff = (log[5] - prev) if prev is not None else 0
-                    if diff > 0:
-                        change_str = f"(+{diff}kg)"
-                    elif diff < 0:
-                        change_str = f"(-{abs(diff)}kg)"
-                    else:
-                        change_str = "(0kg)"
-                    weight_text = f"{log[5]}kg {change_str}"
-                else:
-                    weight_text = ""
-                self.table.setItem(3, col, QTableWidgetItem(weight_text))
-                self.table.setItem(4, col, QTableWidgetItem(log[6] or ""))
-                self.table.setItem(5, col, QTableWidgetItem(log[7] or ""))
-                self.table.setItem(6, col, QTableWidgetItem(f"{log[8]:.2f} 시간" if log[8] else ""))
-                self.table.setItem(7, col, QTableWidgetItem(log[9] or ""))
-                # 식사 정보: 단순 텍스트로 표시 (식사 시각 정보 제거)
-                self.table.setItem(8, col, QTableWidgetItem(log[10] or ""))
-                self.table.setItem(9, col, QTableWidgetItem(log[11] or ""))
-                self.table.setItem(10, col, QTableWidgetItem(log[12] or ""))
-                self.table.setItem(11, col, QTableWidgetItem(log[13] or ""))
-                self.table.setItem(12, col, QTableWidgetItem(log[14] or ""))
-                
+    
+    def show_week(self, day_str=None):
+        # day_str 이 속한 주를 맨 위로 스크롤하고 그 날을 선택합니다. None 이면 오늘입니다.
+        day = datetime.strptime(day_str, "%Y-%m-%d").date() if day_str else date.today()
+        row = self.model.ensure_date(day)
+        self.table.scrollTo(self.model.index(row - row % 7, 0), QAbstractItemView.PositionAtTop)
+        self.table.selectRow(row)
+
+#########################
+# SearchWidget (검색)
+# - 입력을 잠시 멈추면(debounce) 검색하고, 결과를 누르면 해당 날짜로 이동합니다.
+#########################
+class SearchWidget(QWidget):
+    def __init__(self, data_manager, async_data, open_date_callback):
+        super().__init__()
+        self.data_manager = data_manager
+        self.async_data = async_data
+        self.open_date_callback = open_date_callback
+        self.search_request = 0
+        self.initUI()
+    
+    def initUI(self):
+        layout = QVBoxLayout()
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("코멘트, 보강 트레이닝, 식사 검색")
+        self.query_edit.setClearButtonEnabled(True)
+        layout.addWidget(self.query_edit)
+        self.result_list = QListWidget()
+        layout.addWidget(self.result_list)
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        self.setLayout(layout)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.run_search)
+        self.query_edit.textChanged.connect(self.search_timer.start)
+        self.result_list.itemActivated.connect(self.open_result)
+        self.result_list.itemClicked.connect(self.open_result)
+    
+    def run_search(self):
+        text = self.query_edit.text()
+        self.search_request += 1
+        if not text.strip():
+            self.result_list.clear()
+            self.status_label.setText("")
+            return
+        started = time.perf_counter()
+        self.async_data.read(
+            "search_logs", text,
+            callback=lambda results, request=self.search_request: self.show_results(request, results, started))
+    
+    def show_results(self, request, results, started):
+        # 입력 중에 도착한 이전 검색 결과는 버립니다.
+        if request != self.search_request:
+            return
+        self.result_list.clear()
+        for log_date, snippet in results:
+            item = QListWidgetItem()
+            item.setData(Qt.UserRole, log_date)
+            label = QLabel(f"<b>{log_date}</b>&nbsp;&nbsp;{snippet}")
+            label.setTextFormat(Qt.RichText)
+            item.setSizeHint(label.sizeHint())
+            self.result_list.addItem(item)
+            self.result_list.setItemWidget(item, label)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.status_label.setText(f"{len(results)}건 ({elapsed_ms:.0f}ms)")
+    
+    def open_result(self, item):
+        self.open_date_callback(item.data(Qt.UserRole))
+
+#########################
+# TeamDashboardWidget (팀 대시보드)
+# - 등록된 모든 선수의 최근 주간 거리와 아침 심박 경고를 core.aggregate_team 으로 백그라운드에서 모읍니다.
+# - 화면을 열 때마다 새로 집계하고, 늦게 끝난 이전 집계 결과는 버립니다. 행을 두 번 누르면 그 선수로 바꿉니다.
+#########################
+TEAM_WEEK_CHOICES = [4, 8, 12, 26]
+HR_ALERT_COLOR = QColor(255, 220, 220)
+
+class TeamMileageModel(QAbstractTableModel):
+    # 행은 선수(마지막 행은 팀 합계), 열은 주별 거리, 합계, 아침 심박(최근 7일 / 그 전 28일 평균)입니다.
+    def __init__(self):
+        super().__init__()
+        self.athletes = []
+        self.report = None
+        self.alerted = set()
+
+    def set_report(self, athletes, report):
+        self.beginResetModel()
+        self.athletes = athletes
+        self.report = report
+        self.alerted = {alert[0] for alert in report["alerts"]}
+        self.endResetModel()
+
+    def athlete_at(self, row):
+        return self.athletes[row][0] if 0 <= row < len(self.athletes) else None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or self.report is None else len(self.athletes) + 1
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() or self.report is None else len(self.report["weeks"]) + 2
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or self.report is None:
+            return None
+        if orientation == Qt.Vertical:
+            return self.athletes[section][1] if section < len(self.athletes) else "팀 합계"
+        weeks = self.report["weeks"]
+        if section < len(weeks):
+            return datetime.strptime(weeks[section] + "-1", "%G-W%V-%u").strftime("%m/%d~")
+        return "합계" if section == len(weeks) else "아침 심박"
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or self.report is None:
+            return None
+        athlete_id = self.athlete_at(index.row())
+        weeks = self.report["weeks"]
+        column = index.column()
+        if role == Qt.BackgroundRole:
+            return HR_ALERT_COLOR if athlete_id in self.alerted else None
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role == Qt.ToolTipRole and athlete_id in self.report["errors"]:
+            return self.report["errors"][athlete_id]
+        if role != Qt.DisplayRole:
+            return None
+        if athlete_id is None:
+            mileage = self.report["team_km"]
+        elif athlete_id in self.report["errors"]:
+            return "오류" if column == 0 else ""
+        else:
+            mileage = self.report["mileage"].get(athlete_id, {})
+        if column < len(weeks):
+            km = mileage.get(weeks[column])
+            return f"{km:.1f}" if km else ""
+        if column == len(weeks):
+            return f"{sum(km or 0 for km in mileage.values()):.1f}"
+        if athlete_id is None:
+            return f"경고 {len(self.alerted)}명" if self.alerted else ""
+        recent, baseline = self.report["heart_rate"].get(athlete_id, (None, None))
+        if recent is None:
+            return ""
+        return f"{recent:.0f}" if baseline is None else f"{recent:.0f} ({recent - baseline:+.0f})"
+
+class TeamDashboardWidget(QWidget):
+    # 작업 스레드에서 GUI 스레드로 (집계 번호, (선수 목록, 결과 또는 예외, 걸린 시간))
+    loaded = pyqtSignal(int, object)
+
+    def __init__(self, registry, open_athlete_callback):
+        super().__init__()
+        self.registry = registry
+        self.open_athlete_callback = open_athlete_callback
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.generation = 0
+        self.loaded.connect(self.on_loaded)
+        layout = QVBoxLayout()
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("기간"))
+        self.weeks_box = QComboBox()
+        self.weeks_box.addItems([f"최근 {weeks}주" for weeks in TEAM_WEEK_CHOICES])
+        self.weeks_box.setCurrentIndex(TEAM_WEEK_CHOICES.index(8))
+        self.weeks_box.currentIndexChanged.connect(self.refresh)
+        controls.addWidget(self.weeks_box)
+        refresh_button = QPushButton("새로 고침")
+        refresh_button.clicked.connect(self.refresh)
+        controls.addWidget(refresh_button)
+        self.status_label = QLabel("")
+        controls.addWidget(self.status_label, 1)
+        layout.addLayout(controls)
+        self.model = TeamMileageModel()
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.doubleClicked.connect(self.open_row)
+        layout.addWidget(self.table)
+        self.setLayout(layout)
+
+    def refresh(self):
+        self.generation += 1
+        athletes = self.registry.athletes()
+        weeks = TEAM_WEEK_CHOICES[self.weeks_box.currentIndex()]
+        self.status_label.setText(f"{len(athletes)}명 집계 중...")
+        self.executor.submit(self.load, self.generation, athletes, weeks)
+
+    def load(self, generation, athletes, weeks):
+        started = time.perf_counter()
+        try:
+            report = aggregate_team(athletes, weeks)
+        except Exception as e:
+            report = e
+        self.loaded.emit(generation, (athletes, report, time.perf_counter() - started))
+
+    def on_loaded(self, generation, result):
+        if generation != self.generation:
+            return
+        athletes, report, elapsed = result
+        if isinstance(report, Exception):
+            self.status_label.setText(f"집계 실패: {report}")
+            return
+        self.model.set_report(athletes, report)
+        self.table.resizeColumnsToContents()
+        status = f"{len(athletes)}명, {elapsed * 1000:.0f} ms"
+        if report["alerts"]:
+            status += f" - 아침 심박이 평소보다 {HR_ALERT_BPM}bpm 이상 높은 선수 {len(report['alerts'])}명"
+        if report["errors"]:
+            status += f" - 읽지 못한 DB {len(report['errors'])}개"
+        self.status_label.setText(status)
+
+    def open_row(self, index):
+        athlete_id = self.model.athlete_at(index.row())
+        if athlete_id is not None:
+            self.open_athlete_callback(athlete_id)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+#########################
+# DebugPanel (숨겨진 성능 계측 화면, Ctrl+Shift+D)
+#########################
+class DebugPanel(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.initUI()
+    
+    def initUI(self):
+        layout = QVBoxLayout()
+        button_layout = QHBoxLayout()
+        self.enable_button = QPushButton()
+        self.enable_button.setCheckable(True)
+        self.enable_button.setChecked(profiler.enabled)
+        self.enable_button.toggled.connect(self.set_enabled)
+        button_layout.addWidget(self.enable_button)
+        refresh_button = QPushButton("새로고침")
+        refresh_button.clicked.connect(self.refresh)
+        button_layout.addWidget(refresh_button)
+        reset_button = QPushButton("초기화")
+        reset_button.clicked.connect(self.reset)
+        button_layout.addWidget(reset_button)
+        dump_button = QPushButton("Chrome trace 저장")
+        dump_button.clicked.connect(self.dump_trace)
+        button_layout.addWidget(dump_button)
+        layout.addLayout(button_layout)
+        self.summary_view = QTextEdit()
+        self.summary_view.setReadOnly(True)
+        self.summary_view.setLineWrapMode(QTextEdit.NoWrap)
+        self.summary_view.setFont(QFont("Menlo", 10))
+        layout.addWidget(self.summary_view)
+        self.setLayout(layout)
+        self.set_enabled(profiler.enabled)
+    
+    def set_enabled(self, enabled):
+        profiler.set_enabled(enabled)
+        self.enable_button.setText("계측 끄기" if enabled else "계측 켜기")
+        self.refresh()
+    
+    def refresh(self):
+        self.summary_view.setPlainText(profiler.summary())
+    
+    def reset(self):
+        profiler.reset()
+        self.refresh()
+    
+    def dump_trace(self):
+        fileName, _ = QFileDialog.getSaveFileName(self, "Chrome trace 저장", "trace.json", "JSON Files (*.json)")
+        if fileName:
+            profiler.dump_chrome_trace(fileName)
+    
+    def showEvent(self, event):
+        self.refresh()
+        super().showEvent(event)
+
 #########################
 # MonthlyLogWidget (월간 뷰어)
 # - 셀 상단 1/3은 날짜(일자만, 볼드; 일요일 빨간, 토요일 파란), 나머지 2/3은 로그 정보를 하단/오른쪽 정렬하여 표시
 #########################
 class MonthlyLogWidget(QWidget):
-    def __init__(self, data_manager):
+    def __init__(self, data_manager, async_data):
         super().__init__()
         self.data_manager = data_manager
+        self.async_data = async_data
         self.initUI()
     
     def initUI(self):
         layout = QVBoxLayout()
-        self.calendar = CustomCalendarWidget(self.data_manager)
+        self.calendar = CustomCalendarWidget(self.data_manager, self.async_data)
         layout.addWidget(self.calendar)
         self.setLayout(layout)
 
 #########################
 # 백업 데이터 불러오기 기능
+# - 파일을 고르면 BackupImportWorker 스레드에서 core.import_backup 을 실행하고 진행 대화상자를 띄웁니다.
 #########################
+class BackupImportWorker(QThread):
+    # (처리한 행 수, 전체 행 수(모르면 0), 초당 행 수)
+    progress = pyqtSignal(int, int, float)
+
+    def __init__(self, db_path, file_name):
+        super().__init__()
+        self.db_path = db_path
+        self.file_name = file_name
+        self.cancelled = False
+        self.error = None
+        self.imported = 0
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        # sqlite3 연결은 스레드 간에 공유할 수 없으므로 작업 스레드 전용 연결을 엽니다.
+        data_manager = DataManager(self.db_path)
+        try:
+            self.imported = import_backup(data_manager, self.file_name, progress=self.progress.emit,
+                                          cancelled=lambda: self.cancelled)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            data_manager.conn.close()
+
+def run_with_progress(worker, title, label, unit="행"):
+    # worker 는 progress(처리 수, 전체 수, 초당 처리 수) 시그널과 cancel() 을 가진 QThread 입니다.
+    dialog = QProgressDialog(label, "취소", 0, 0)
+    dialog.setWindowTitle(title)
+    dialog.setWindowModality(Qt.ApplicationModal)
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+
+    def on_progress(done, total, rate):
+        if total:
+            dialog.setMaximum(total)
+            dialog.setValue(min(done, total))
+        dialog.setLabelText(f"{label}\n{done}{unit} 처리 ({rate:.0f}{unit}/초)")
+
+    worker.progress.connect(on_progress)
+    worker.finished.connect(dialog.accept)
+    dialog.canceled.connect(worker.cancel)
+    worker.start()
+    dialog.exec_()
+    worker.wait()
+
 def import_backup_data(data_manager):
-    fileName, _ = QFileDialog.getOpenFileName(None, "백업 파일 불러오기", "", "Excel Files (*.xlsx);;All Files (*)")
+    fileName, _ = QFileDialog.getOpenFileName(None, "백업 파일 불러오기", "", "Excel Files (*.xlsx);;CSV Files (*.csv *.tsv);;NDJSON Files (*.ndjson *.jsonl);;All Files (*)")
     if not fileName:
         return
-    try:
-        wb = openpyxl.load_workbook(fileName)
-        ws = wb.active
-        for row in ws.iter_rows(min_row=2, values_only=True):
-            log = {
-                'date': str(row[0]) if row[0] is not None else "",
-                'running_training': row[1] if row[1] is not None else "",
-                'strength_training': row[2] if row[2] is not None else "",
-                'morning_heart_rate': int(row[3]) if row[3] is not None else 0,
-                'fasting_weight': int(row[4]) if row[4] is not None else 0,
-                'bedtime': row[5] if row[5] is not None else "",
-                'wakeup_time': row[6] if row[6] is not None else "",
-                'sleep_time': float(row[7]) if row[7] is not None else 0.0,
-                'bowel': row[8] if row[8] is not None else "",
-                'meal_breakfast': row[9] if row[9] is not None else "",
-                'meal_lunch': row[10] if row[10] is not None else "",
-                'meal_dinner': row[11] if row[11] is not None else "",
-                'meal_snack': row[12] if row[12] is not None else "",
-                'comment': row[13] if row[13] is not None else ""
-            }
-            data_manager.save_log(log)
-        QMessageBox.information(None, "불러오기 완료", "백업 데이터가 성공적으로 불러와졌습니다.")
-    except Exception as e:
-        QMessageBox.warning(None, "오류", f"백업 데이터를 불러오는 중 오류 발생:\n{str(e)}")
+    worker = BackupImportWorker(data_manager.db_path, fileName)
+    run_with_progress(worker, "백업 불러오기", "백업 데이터를 불러오는 중...")
+    if worker.error:
+        QMessageBox.warning(None, "오류", f"백업 데이터를 불러오는 중 오류 발생:\n{worker.error}\n변경 사항은 모두 취소되었습니다.")
+    elif worker.cancelled:
+        QMessageBox.information(None, "불러오기 취소", "백업 불러오기가 취소되었습니다. 변경 사항은 저장되지 않았습니다.")
+    else:
+        data_manager.notify_saved(None)
+        QMessageBox.information(None, "불러오기 완료", f"백업 데이터가 성공적으로 불러와졌습니다. ({worker.imported}행)")
+
+#########################
+# 자동 백업 (DB 스냅샷)
+# - BackupScheduler 가 주기적으로 작업 스레드에서 core.create_snapshot / prune_snapshots 를 실행합니다.
+# - 복원 화면은 스냅샷을 골라 백업 API 로 페이지를 통째로 덮어씁니다 (엑셀을 행 단위로 다시 가져오는 것보다 빠릅니다).
+#########################
+SNAPSHOT_FIRST_DELAY_MS = 30 * 1000
+SNAPSHOT_CHECK_MS = 60 * 60 * 1000
+
+class BackupScheduler(QObject):
+    # 작업 스레드에서 스냅샷을 만들고 끝나면 GUI 스레드로 (스냅샷 경로, 오류 메시지) 를 알립니다.
+    finished = pyqtSignal(object, object)
+
+    def __init__(self, db_path, directory=None, interval=SNAPSHOT_INTERVAL, retention=SNAPSHOT_RETENTION):
+        super().__init__()
+        self.db_path = db_path
+        self.directory = directory or backup_dir()
+        self.interval = interval
+        self.retention = retention
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.future = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(SNAPSHOT_CHECK_MS)
+        self.timer.timeout.connect(self.run_if_due)
+
+    def start(self, first_delay_ms=SNAPSHOT_FIRST_DELAY_MS):
+        # 시작 직후에는 화면을 띄우는 데 집중하도록 첫 검사를 조금 미룹니다.
+        self.timer.start()
+        QTimer.singleShot(first_delay_ms, self.run_if_due)
+
+    def is_due(self):
+        snapshots = list_snapshots(self.directory)
+        return not snapshots or datetime.now() - snapshots[0][0] >= self.interval
+
+    def run_if_due(self):
+        if self.is_due():
+            self.run_now()
+
+    def run_now(self):
+        if self.future is not None and not self.future.done():
+            return
+        self.future = self.executor.submit(self.take_snapshot)
+
+    def take_snapshot(self):
+        try:
+            path = create_snapshot(self.db_path, self.directory)
+            prune_snapshots(self.directory, self.retention)
+        except Exception as e:
+            self.finished.emit(None, str(e))
+            return
+        self.finished.emit(path, None)
+
+    def shutdown(self):
+        # 진행 중인 스냅샷은 끝까지 만들고 종료합니다.
+        self.timer.stop()
+        self.executor.shutdown(wait=True)
+
+class SnapshotRestoreWorker(QThread):
+    # (복사한 페이지 수, 전체 페이지 수, 초당 페이지 수)
+    progress = pyqtSignal(int, int, float)
+
+    def __init__(self, db_path, snapshot_path, directory=None):
+        super().__init__()
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path
+        self.directory = directory or backup_dir()
+        self.cancelled = False
+        self.error = None
+        self.safety_snapshot = None
+        self.started_at = None
+
+    def cancel(self):
+        self.cancelled = True
+
+    def on_pages(self, status, remaining, total):
+        # 예외를 던지면 백업 API 가 대상 DB 의 변경을 모두 되돌립니다.
+        if self.cancelled:
+            raise InterruptedError("취소됨")
+        elapsed = time.perf_counter() - self.started_at
+        done = total - remaining
+        self.progress.emit(done, total, done / elapsed if elapsed > 0 else 0.0)
+
+    def run(self):
+        raw_path = os.path.join(self.directory, "restore.db.tmp")
+        try:
+            with gzip.open(self.snapshot_path, "rb") as src, open(raw_path, "wb") as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            source = sqlite3.connect(raw_path)
+            try:
+                check_integrity(source)
+                # 복원 전에 지금 DB 도 스냅샷으로 남겨 되돌릴 수 있게 합니다.
+                self.safety_snapshot = create_snapshot(self.db_path, self.directory)
+                if self.cancelled:
+                    return
+                target = connect_database(self.db_path)
+                self.started_at = time.perf_counter()
+                try:
+                    source.backup(target, pages=RESTORE_PAGES_PER_STEP, progress=self.on_pages)
+                finally:
+                    target.close()
+            finally:
+                source.close()
+            # 예전 스키마의 스냅샷이면 여기서 현재 버전으로 마이그레이션됩니다.
+            DataManager(self.db_path).conn.close()
+        except InterruptedError:
+            pass
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            if os.path.exists(raw_path):
+                os.remove(raw_path)
+
+def restore_snapshot(data_manager, parent=None, directory=None):
+    snapshots = list_snapshots(directory)
+    if not snapshots:
+        QMessageBox.information(parent, "스냅샷 복원", "복원할 자동 백업이 없습니다.")
+        return
+    labels = [f"{taken.strftime('%Y-%m-%d %H:%M:%S')} ({os.path.getsize(path) / 1024:.0f} KB)" for taken, path in snapshots]
+    label, ok = QInputDialog.getItem(parent, "스냅샷 복원", "복원할 자동 백업:", labels, 0, False)
+    if not ok or not label:
+        return
+    answer = QMessageBox.question(
+        parent, "스냅샷 복원", f"{label} 시점으로 모든 기록을 되돌립니다.\n지금 DB 는 복원 전에 스냅샷으로 저장됩니다. 계속하시겠습니까?",
+        QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+    if answer != QMessageBox.Yes:
+        return
+    worker = SnapshotRestoreWorker(data_manager.db_path, snapshots[labels.index(label)][1], directory)
+    run_with_progress(worker, "스냅샷 복원", "자동 백업을 복원하는 중...", unit="페이지")
+    if worker.error:
+        QMessageBox.warning(parent, "오류", f"스냅샷을 복원하는 중 오류 발생:\n{worker.error}\n기존 기록은 그대로입니다.")
+    elif worker.cancelled:
+        QMessageBox.information(parent, "복원 취소", "스냅샷 복원이 취소되었습니다. 기존 기록은 그대로입니다.")
+    else:
+        data_manager.notify_saved(None)
+        QMessageBox.information(parent, "복원 완료", "자동 백업을 복원했습니다.")
+
+#########################
+# 활동 파일 (GPX/TCX) 가져오기
+# - 폴더를 고르거나 창에 파일/폴더를 끌어 놓으면 activity.ingest_activities 로 별도 스레드에서 가져옵니다.
+#   파일 분석은 그 안에서 프로세스 풀로 나눠 하고, 이미 가져온 파일(내용 해시)은 건너뜁니다.
+#########################
+# 위치 기록으로 만드는 세션은 거리(km) 입력을 쓰는 종류만 고를 수 있습니다.
+ACTIVITY_SESSION_TYPES = ["조깅", "지속주", "LSD", "TT", "크로스컨트리"]
+
+class ActivityImportWorker(QThread):
+    # (분석한 파일 수, 전체 파일 수, 초당 파일 수)
+    progress = pyqtSignal(int, int, float)
+
+    def __init__(self, db_path, paths, activity_type):
+        super().__init__()
+        self.db_path = db_path
+        self.paths = paths
+        self.activity_type = activity_type
+        self.cancelled = False
+        self.error = None
+        self.result = None
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        import activity
+        data_manager = DataManager(self.db_path)
+        try:
+            self.result = activity.ingest_activities(data_manager, self.paths, self.activity_type,
+                                                     progress=self.progress.emit, cancelled=lambda: self.cancelled)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            data_manager.conn.close()
+
+def import_activity_files(data_manager, paths, parent=None):
+    activity_type, ok = QInputDialog.getItem(parent, "활동 파일 가져오기", "세션 종류:", ACTIVITY_SESSION_TYPES, 0, False)
+    if not ok or not activity_type:
+        return
+    worker = ActivityImportWorker(data_manager.db_path, paths, activity_type)
+    run_with_progress(worker, "활동 파일 가져오기", "GPX/TCX 파일을 분석하는 중...", unit="개")
+    if worker.error:
+        QMessageBox.warning(parent, "오류", f"활동 파일을 가져오는 중 오류 발생:\n{worker.error}\n변경 사항은 모두 취소되었습니다.")
+        return
+    if worker.cancelled:
+        QMessageBox.information(parent, "가져오기 취소", "활동 파일 가져오기가 취소되었습니다. 변경 사항은 저장되지 않았습니다.")
+        return
+    result = worker.result
+    if result["imported"]:
+        data_manager.notify_saved(None)
+    lines = [f"{len(result['imported'])}개 파일을 가져왔습니다."]
+    if result["skipped"]:
+        lines.append(f"이미 가져온 파일 {result['skipped']}개는 건너뛰었습니다.")
+    if result["errors"]:
+        lines.append(f"읽지 못한 파일 {len(result['errors'])}개:")
+        lines.extend(f"  {os.path.basename(name)}: {error}" for name, error in list(result["errors"].items())[:10])
+    QMessageBox.information(parent, "가져오기 완료", "\n".join(lines))
 
 #########################
 # 이미지로 내보내기 기능 (주간, 월간 뷰)
 #########################
+@traced("export_view_as_image")
 def export_view_as_image(widget):
     pixmap = widget.grab()
     fileName, _ = QFileDialog.getSaveFileName(None, "이미지 파일로 내보내기", "", "PNG Files (*.png);;All Files (*)")
@@ -657,41 +1705,388 @@ def export_view_as_image(widget):
         QMessageBox.information(None, "내보내기 완료", f"파일이 저장되었습니다: {fileName}")
 
 #########################
-# 엑셀 내보내기 기능 (백업 전용)
+# 오프스크린 렌더링 (주간/월간 일괄 내보내기)
+# - 화면에 위젯을 띄우지 않고 DB 데이터만으로 QImage 에 주간 표/월간 달력을 그립니다.
+# - QT_QPA_PLATFORM=offscreen 에서도 동작하며, 기간별 페이지는 프로세스 풀에서 병렬로 렌더링합니다.
 #########################
+WEEK_PAGE_SIZE = (1600, 1000)
+MONTH_PAGE_SIZE = (1400, 1000)
+WEEKDAY_NAMES = ["월", "화", "수", "목", "금", "토", "일"]
+
+def period_starts(kind, start_date, end_date):
+    # kind: "week" 이면 각 주의 월요일, "month" 이면 각 달의 1일 목록
+    if kind == "week":
+        current = start_date - timedelta(days=start_date.weekday())
+        step = lambda d: d + timedelta(days=7)
+    else:
+        current = start_date.replace(day=1)
+        step = lambda d: (d + timedelta(days=32)).replace(day=1)
+    starts = []
+    while current <= end_date:
+        starts.append(current)
+        current = step(current)
+    return starts
+
+def render_week_page(painter, rect, monday, logs, metrics):
+    dates = [(monday + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(7)]
+    logs_by_date = {log[1]: log for log in logs}
+    columns = [format_week_day(logs_by_date.get(d), metrics.previous("fasting_weight", d)) for d in dates]
+    label_width = 120
+    header_height = 40
+    fixed_height = 40
+    # 위젯과 같이 러닝/보강 행은 남는 높이를 나눠 갖고 나머지 행은 고정 높이입니다.
+    stretch_height = max((rect.height() - header_height - fixed_height * 11) // 2, fixed_height)
+    row_heights = [stretch_height, stretch_height] + [fixed_height] * 11
+    col_width = (rect.width() - label_width) / 7.0
+    font = painter.font()
+    font.setPixelSize(14)
+    painter.setFont(font)
+    painter.setPen(Qt.black)
+    for col, d in enumerate(dates):
+        x = rect.left() + label_width + col * col_width
+        painter.drawRect(QRectF(x, rect.top(), col_width, header_height))
+        painter.drawText(QRectF(x, rect.top(), col_width, header_height), Qt.AlignCenter,
+                         f"{d} ({WEEKDAY_NAMES[col]})")
+    y = rect.top() + header_height
+    for row, height in enumerate(row_heights):
+        painter.drawRect(QRectF(rect.left(), y, label_width, height))
+        painter.drawText(QRectF(rect.left() + 4, y, label_width - 8, height), Qt.AlignVCenter | Qt.AlignLeft, WEEK_FIELDS[row])
+        for col in range(7):
+            x = rect.left() + label_width + col * col_width
+            cell = QRectF(x, y, col_width, height)
+            painter.drawRect(cell)
+            painter.drawText(cell.adjusted(4, 2, -4, -2), Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap, columns[col][row])
+        y += height
+
+def render_month_page(painter, rect, first, summaries, metrics):
+    entries = build_month_cell_entries(summaries, metrics)
+    title_height = 60
+    header_height = 30
+    grid_start = first - timedelta(days=first.weekday())
+    col_width = rect.width() / 7.0
+    row_height = (rect.height() - title_height - header_height) / 6.0
+    font = painter.font()
+    font.setPixelSize(24)
+    font.setBold(True)
+    painter.setFont(font)
+    painter.setPen(Qt.black)
+    painter.drawText(QRectF(rect.left(), rect.top(), rect.width(), title_height), Qt.AlignCenter,
+                     f"{first.year}년 {first.month}월")
+    font.setPixelSize(14)
+    painter.setFont(font)
+    for col, name in enumerate(WEEKDAY_NAMES):
+        painter.drawText(QRectF(rect.left() + col * col_width, rect.top() + title_height, col_width, header_height),
+                         Qt.AlignCenter, name)
+    for i in range(42):
+        d = grid_start + timedelta(days=i)
+        cell = QRectF(rect.left() + (i % 7) * col_width,
+                      rect.top() + title_height + header_height + (i // 7) * row_height,
+                      col_width, row_height)
+        painter.setPen(Qt.black)
+        painter.drawRect(cell)
+        date_rect = QRectF(cell.left(), cell.top(), cell.width(), cell.height() / 3)
+        font.setBold(True)
+        painter.setFont(font)
+        if d.month != first.month:
+            painter.setPen(Qt.gray)
+        elif d.weekday() == 6:
+            painter.setPen(Qt.red)
+        elif d.weekday() == 5:
+            painter.setPen(Qt.blue)
+        painter.drawText(date_rect, Qt.AlignCenter, str(d.day))
+        values = format_month_cell(entries.get(d.strftime("%Y-%m-%d")))
+        if values:
+            font.setBold(False)
+            painter.setFont(font)
+            painter.setPen(Qt.black)
+            log_rect = cell.adjusted(2, cell.height() / 3, -4, -2)
+            painter.drawText(log_rect, Qt.AlignRight | Qt.AlignBottom | Qt.TextWordWrap, "\n".join(values))
+
+def render_period_image(data_manager, kind, period_start):
+    if kind == "week":
+        first = period_start
+        last = period_start + timedelta(days=6)
+        logs = data_manager.get_logs_between(first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d"))
+        width, height = WEEK_PAGE_SIZE
+    else:
+        first = period_start - timedelta(days=period_start.weekday())
+        last = first + timedelta(days=41)
+        logs = data_manager.get_day_summaries_between(first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d"))
+        width, height = MONTH_PAGE_SIZE
+    # 몸무게 변화는 이 쪽의 날짜에 대해서만 필요하므로 전체 기록 대신 이 기간(과 직전 값)만 읽습니다.
+    metrics = data_manager.build_metric_store(first.strftime("%Y-%m-%d"), last.strftime("%Y-%m-%d"))
+    image = QImage(width, height, QImage.Format_ARGB32)
+    image.fill(Qt.white)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.TextAntialiasing)
+    page_rect = QRectF(20, 20, width - 40, height - 40)
+    if kind == "week":
+        render_week_page(painter, page_rect, period_start, logs, metrics)
+    else:
+        render_month_page(painter, page_rect, period_start, logs, metrics)
+    painter.end()
+    return image
+
+render_app = None
+
+def render_period_png(db_path, kind, period_start):
+    # 프로세스 풀에서 실행됩니다. 자식 프로세스마다 오프스크린 QGuiApplication 을 하나 만듭니다.
+    global render_app
+    if QGuiApplication.instance() is None:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        render_app = QGuiApplication([])
+        render_app.setFont(QFont("AppleSDGothicNeo", 10))
+    data_manager = DataManager(db_path, read_only=True)
+    try:
+        image = render_period_image(data_manager, kind, period_start)
+    finally:
+        data_manager.conn.close()
+    buffer = QBuffer()
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, "PNG")
+    return bytes(buffer.data())
+
+def render_periods(db_path, kind, start_date, end_date, workers=None, cancelled=lambda: False):
+    # (기간 시작일, PNG 바이트) 를 기간 순서대로 돌려줍니다.
+    starts = period_starts(kind, start_date, end_date)
+    if workers == 1:
+        for period_start in starts:
+            if cancelled():
+                return
+            yield period_start, render_period_png(db_path, kind, period_start)
+        return
+    # Qt 가 이미 떠 있는 프로세스를 fork 하지 않도록 spawn 으로 자식 프로세스를 만듭니다.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(render_period_png, db_path, kind, period_start) for period_start in starts]
+        for period_start, future in zip(starts, futures):
+            if cancelled():
+                for f in futures:
+                    f.cancel()
+                return
+            yield period_start, future.result()
+
+@traced("export_periods")
+def export_periods(db_path, kind, start_date, end_date, file_name, workers=None, progress=None, cancelled=lambda: False):
+    # file_name 이 .pdf 이면 기간마다 한 페이지인 PDF, 아니면 "<이름>_<기간 시작일>.png" 파일들을 만듭니다.
+    total = len(period_starts(kind, start_date, end_date))
+    base, ext = os.path.splitext(file_name)
+    writer = None
+    painter = None
+    if ext.lower() == ".pdf":
+        writer = QPdfWriter(file_name)
+        writer.setPageSize(QPageSize(QPageSize.A4))
+        writer.setPageOrientation(QPageLayout.Landscape)
+        writer.setResolution(150)
+        painter = QPainter(writer)
+    done = 0
+    try:
+        for period_start, png in render_periods(db_path, kind, start_date, end_date, workers, cancelled):
+            if writer is not None:
+                if done:
+                    writer.newPage()
+                image = QImage.fromData(png, "PNG")
+                target = painter.viewport()
+                scaled = image.size().scaled(target.size(), Qt.KeepAspectRatio)
+                painter.drawImage(QRectF(0, 0, scaled.width(), scaled.height()), image)
+            else:
+                with open(f"{base}_{period_start.strftime('%Y-%m-%d')}.png", "wb") as f:
+                    f.write(png)
+            done += 1
+            if progress:
+                progress(done, total)
+    finally:
+        if painter is not None:
+            painter.end()
+    return done
+
+class PeriodExportWorker(QThread):
+    # (처리한 페이지 수, 전체 페이지 수, 초당 페이지 수)
+    progress = pyqtSignal(int, int, float)
+
+    def __init__(self, db_path, kind, start_date, end_date, file_name):
+        super().__init__()
+        self.db_path = db_path
+        self.kind = kind
+        self.start_date = start_date
+        self.end_date = end_date
+        self.file_name = file_name
+        self.cancelled = False
+        self.error = None
+        self.exported = 0
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        started = time.perf_counter()
+
+        def on_progress(done, total):
+            self.exported = done
+            elapsed = time.perf_counter() - started
+            self.progress.emit(done, total, done / elapsed if elapsed > 0 else 0.0)
+
+        try:
+            export_periods(self.db_path, self.kind, self.start_date, self.end_date, self.file_name,
+                           progress=on_progress, cancelled=lambda: self.cancelled)
+        except Exception as e:
+            self.error = str(e)
+
+def export_period_range(data_manager, parent=None):
+    option, ok = QInputDialog.getItem(parent, "기간 일괄 내보내기", "단위:", ("주간", "월간"), 0, False)
+    if not ok:
+        return
+    today = date.today().strftime("%Y-%m-%d")
+    start_text, ok = QInputDialog.getText(parent, "기간 일괄 내보내기", "시작 날짜 (yyyy-MM-dd):", text=today)
+    if not ok:
+        return
+    end_text, ok = QInputDialog.getText(parent, "기간 일괄 내보내기", "끝 날짜 (yyyy-MM-dd):", text=today)
+    if not ok:
+        return
+    try:
+        start_date = datetime.strptime(start_text.strip(), "%Y-%m-%d").date()
+        end_date = datetime.strptime(end_text.strip(), "%Y-%m-%d").date()
+    except ValueError:
+        QMessageBox.warning(parent, "오류", "날짜 형식이 올바르지 않습니다. (예: 2025-01-31)")
+        return
+    if end_date < start_date:
+        QMessageBox.warning(parent, "오류", "끝 날짜가 시작 날짜보다 빠릅니다.")
+        return
+    fileName, _ = QFileDialog.getSaveFileName(parent, "기간 일괄 내보내기", "",
+                                              "PDF Files (*.pdf);;PNG Files (*.png)")
+    if not fileName:
+        return
+    kind = "week" if option == "주간" else "month"
+    worker = PeriodExportWorker(data_manager.db_path, kind, start_date, end_date, fileName)
+    run_with_progress(worker, "기간 일괄 내보내기", "페이지를 렌더링하는 중...")
+    if worker.error:
+        QMessageBox.warning(parent, "오류", f"내보내는 중 오류 발생:\n{worker.error}")
+    elif not worker.cancelled:
+        QMessageBox.information(parent, "내보내기 완료", f"{worker.exported}개 페이지를 저장했습니다: {fileName}")
+
+#########################
+# 엑셀/CSV/NDJSON 내보내기 기능 (백업 전용)
+# - 파일 이름을 먼저 받고, BackupExportWorker 스레드에서 core.export_backup 을 실행하고 진행 대화상자를 띄웁니다.
+#########################
+class BackupExportWorker(QThread):
+    # (처리한 행 수, 전체 행 수, 초당 행 수)
+    progress = pyqtSignal(int, int, float)
+
+    def __init__(self, db_path, file_name, file_format):
+        super().__init__()
+        self.db_path = db_path
+        self.file_name = file_name
+        self.file_format = file_format
+        self.cancelled = False
+        self.error = None
+        self.exported = 0
+
+    def cancel(self):
+        self.cancelled = True
+
+    @traced("BackupExportWorker.run")
+    def run(self):
+        data_manager = DataManager(self.db_path)
+        try:
+            self.exported = export_backup(data_manager, self.file_name, self.file_format,
+                                          progress=self.progress.emit, cancelled=lambda: self.cancelled)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            data_manager.conn.close()
+
+@traced("export_to_excel_backup")
 def export_to_excel_backup(data_manager):
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Backup"
-    ws.append([
-        "날짜", "러닝 트레이닝(JSON)", "보강 트레이닝", "아침 심박수", "공복 몸무게",
-        "작일 취침 시각", "기상 시각", "수면 시간", "배변 여부",
-        "아침", "점심", "저녁", "간식", "코멘트"
-    ])
-    logs = data_manager.get_all_logs()
-    for log in logs:
-        ws.append([
-            log[1], log[2], log[3], log[4], log[5],
-            log[6], log[7], log[8], log[9],
-            log[10], log[11], log[12], log[13], log[14]
-        ])
-    fileName, _ = QFileDialog.getSaveFileName(None, "백업 파일로 내보내기", "", "Excel Files (*.xlsx);;All Files (*)")
-    if fileName:
-        wb.save(fileName)
+    fileName, selected_filter = QFileDialog.getSaveFileName(
+        None, "백업 파일로 내보내기", "",
+        "Excel Files (*.xlsx);;CSV Files (*.csv);;TSV Files (*.tsv);;NDJSON Files (*.ndjson);;All Files (*)")
+    if not fileName:
+        return
+    if fileName.lower().endswith(".csv") or selected_filter.startswith("CSV"):
+        file_format = "csv"
+    elif fileName.lower().endswith(".tsv") or selected_filter.startswith("TSV"):
+        file_format = "tsv"
+    elif backup_format(fileName) == "ndjson" or selected_filter.startswith("NDJSON"):
+        file_format = "ndjson"
+    else:
+        file_format = "xlsx"
+    if backup_format(fileName, None) != file_format:
+        fileName += "." + file_format
+    worker = BackupExportWorker(data_manager.db_path, fileName, file_format)
+    run_with_progress(worker, "백업 내보내기", "백업 파일을 저장하는 중...")
+    if worker.error:
+        QMessageBox.warning(None, "오류", f"백업 파일을 저장하는 중 오류 발생:\n{worker.error}")
+    elif not worker.cancelled:
         QMessageBox.information(None, "내보내기 완료", f"백업 파일이 저장되었습니다: {fileName}")
 
+#########################
+# 선수별 세션
+# - 선수 한 명의 DataManager, 비동기 작업 스레드(읽기 연결 포함), 자동 백업, 화면을 한 묶음으로 둡니다.
+# - MainWindow 는 최근에 연 ATHLETE_SESSION_CACHE_SIZE 명의 세션을 그대로 들고 있어서, 선수를 다시 고르면
+#   연결과 캐시, 만들어 둔 화면을 그대로 다시 씁니다. 밀려난 세션은 입력을 저장한 뒤 닫습니다.
+#########################
+ATHLETE_SESSION_CACHE_SIZE = 4
+
+class AthleteSession:
+    def __init__(self, athlete_id, name, db_path, backup_directory, window):
+        self.athlete_id = athlete_id
+        self.name = name
+        self.backup_directory = backup_directory
+        self.data_manager = DataManager(db_path)
+        self.async_data = AsyncDataManager(self.data_manager)
+        # 오류는 이 세션의 일간 화면에만 돌려줍니다 (다른 선수의 저장 버튼을 건드리지 않도록).
+        self.async_data.failed.connect(lambda message: window.show_data_error(self, message))
+        self.backup_scheduler = BackupScheduler(db_path, backup_directory)
+        self.backup_scheduler.finished.connect(window.on_snapshot_finished)
+        self.daily_view = DailyLogWidget(self.data_manager, self.async_data,
+                                         lambda: window.show_week_of(self.daily_view.current_date))
+        self.views = {"daily": self.daily_view}
+        self.backup_scheduler.start()
+
+    def close(self, stack):
+        # 아직 저장되지 않은 입력을 쓰고, 대기 중인 쓰기가 끝날 때까지 기다립니다.
+        self.daily_view.autosave()
+        self.async_data.shutdown()
+        self.backup_scheduler.shutdown()
+        for widget in self.views.values():
+            stack.removeWidget(widget)
+            widget.deleteLater()
+        self.data_manager.conn.close()
+
 #########################
 # MainWindow
 #########################
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, registry=None):
         super().__init__()
-        self.data_manager = DataManager()
+        self.registry = registry or AthleteRegistry()
+        self.sessions = OrderedDict()
+        self.session = None
+        self.team_view = None
         self.initUI()
+        self.switch_athlete(self.registry.last_opened())
+    
+    # 지금 선택한 선수의 세션을 가리킵니다.
+    @property
+    def data_manager(self):
+        return self.session.data_manager
+    
+    @property
+    def async_data(self):
+        return self.session.async_data
+    
+    @property
+    def daily_view(self):
+        return self.session.daily_view
+    
+    @property
+    def views(self):
+        return self.session.views
     
     def initUI(self):
         self.setWindowTitle("훈련 일지")
         self.setGeometry(100, 100, 800, 600)
+        # GPX/TCX 파일이나 폴더를 끌어 놓으면 가져옵니다.
+        self.setAcceptDrops(True)
         self.setFont(QFont("AppleSDGothicNeo", 10))
         
         toolbar = QToolBar()
@@ -709,50 +2104,221 @@ class MainWindow(QMainWindow):
         self.monthly_button.clicked.connect(self.show_monthly)
         toolbar.addWidget(self.monthly_button)
         
+        self.search_button = QPushButton("검색")
+        self.search_button.clicked.connect(self.show_search)
+        toolbar.addWidget(self.search_button)
+        
+        self.athlete_box = QComboBox()
+        self.athlete_box.currentIndexChanged.connect(self.on_athlete_selected)
+        toolbar.addWidget(self.athlete_box)
+        
+        self.add_athlete_button = QPushButton("선수 추가")
+        self.add_athlete_button.clicked.connect(self.add_athlete)
+        toolbar.addWidget(self.add_athlete_button)
+        
+        self.team_button = QPushButton("팀")
+        self.team_button.clicked.connect(self.show_team)
+        toolbar.addWidget(self.team_button)
+        
         self.export_button = QPushButton("내보내기")
         self.export_button.clicked.connect(self.export_data)
         toolbar.addWidget(self.export_button)
         
         self.import_button = QPushButton("백업 불러오기")
-        self.import_button.clicked.connect(lambda: import_backup_data(self.data_manager))
+        self.import_button.clicked.connect(self.import_data)
         toolbar.addWidget(self.import_button)
         
         self.stack = QStackedWidget()
-        self.daily_view = DailyLogWidget(self.data_manager, self.show_weekly)
-        self.weekly_view = WeeklyLogWidget(self.data_manager)
-        self.monthly_view = MonthlyLogWidget(self.data_manager)
-        self.stack.addWidget(self.daily_view)
-        self.stack.addWidget(self.weekly_view)
-        self.stack.addWidget(self.monthly_view)
+        # 선수마다 일간 화면만 바로 만들고, 나머지 화면은 처음 열 때 만듭니다 (view 참고).
+        self.view_factories = {
+            "weekly": lambda: WeeklyLogWidget(self.data_manager, self.async_data),
+            "monthly": lambda: MonthlyLogWidget(self.data_manager, self.async_data),
+            "search": lambda: SearchWidget(self.data_manager, self.async_data, self.open_date),
+            "debug": DebugPanel,
+        }
+        debug_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        debug_shortcut.activated.connect(lambda: self.stack.setCurrentWidget(self.view("debug")))
         self.setCentralWidget(self.stack)
+        self.refresh_athlete_box()
+    
+    def refresh_athlete_box(self, selected_id=None):
+        self.athlete_box.blockSignals(True)
+        self.athlete_box.clear()
+        for athlete_id, name, _ in self.registry.athletes():
+            self.athlete_box.addItem(name, athlete_id)
+        if selected_id is not None:
+            self.athlete_box.setCurrentIndex(self.athlete_box.findData(selected_id))
+        self.athlete_box.blockSignals(False)
+    
+    def on_athlete_selected(self, index):
+        if index >= 0:
+            self.switch_athlete(self.athlete_box.itemData(index))
+    
+    def switch_athlete(self, athlete_id):
+        if self.session is not None and self.session.athlete_id == athlete_id:
+            self.show_daily()
+            return
+        if self.session is not None:
+            self.session.daily_view.autosave()
+        session = self.sessions.pop(athlete_id, None)
+        if session is None:
+            _, name, db_path = self.registry.get(athlete_id)
+            session = AthleteSession(athlete_id, name, db_path, self.registry.backup_dir(athlete_id), self)
+            self.stack.addWidget(session.daily_view)
+        self.sessions[athlete_id] = session
+        self.session = session
+        while len(self.sessions) > ATHLETE_SESSION_CACHE_SIZE:
+            _, evicted = self.sessions.popitem(last=False)
+            evicted.close(self.stack)
+        self.registry.touch(athlete_id)
+        self.refresh_athlete_box(athlete_id)
+        self.setWindowTitle(f"훈련 일지 - {session.name}")
         self.show_daily()
     
+    def add_athlete(self):
+        name, ok = QInputDialog.getText(self, "선수 추가", "이름:")
+        if not ok or not name.strip():
+            return
+        try:
+            athlete_id = self.registry.add(name)
+        except ValueError as e:
+            QMessageBox.warning(self, "선수 추가", str(e))
+            return
+        self.switch_athlete(athlete_id)
+    
+    def show_team(self):
+        if self.team_view is None:
+            self.team_view = TeamDashboardWidget(self.registry, self.switch_athlete)
+            self.stack.addWidget(self.team_view)
+        self.team_view.refresh()
+        self.stack.setCurrentWidget(self.team_view)
+    
+    def view(self, name):
+        if name not in self.views:
+            widget = self.view_factories[name]()
+            self.stack.addWidget(widget)
+            self.views[name] = widget
+        return self.views[name]
+    
+    def show_data_error(self, session, message):
+        # 불러오는 중이면 입력란과 함께 잠긴 채로 둡니다.
+        session.daily_view.save_button.setEnabled(not session.daily_view.loading)
+        who = "" if session is self.session else f" ({session.name})"
+        QMessageBox.warning(self, "오류", f"데이터 처리 중 오류 발생{who}:\n{message}")
+    
+    def on_snapshot_finished(self, path, error):
+        if error:
+            self.statusBar().showMessage(f"자동 백업 실패: {error}", 10000)
+        else:
+            self.statusBar().showMessage(f"자동 백업 완료: {os.path.basename(path)}", 5000)
+    
+    def closeEvent(self, event):
+        # 아직 저장되지 않은 입력을 쓰고, 대기 중인 쓰기가 끝날 때까지 기다립니다.
+        for session in self.sessions.values():
+            session.close(self.stack)
+        self.sessions.clear()
+        if self.team_view is not None:
+            self.team_view.shutdown()
+        trace_file = os.environ.get("TRAINING_LOG_PROFILE")
+        if trace_file:
+            profiler.dump_chrome_trace(trace_file)
+        super().closeEvent(event)
+    
     def show_daily(self):
         self.stack.setCurrentWidget(self.daily_view)
     
     def show_weekly(self):
-        self.weekly_view.load_week_data()
-        self.stack.setCurrentWidget(self.weekly_view)
+        weekly_view = self.view("weekly")
+        weekly_view.show_week()
+        self.stack.setCurrentWidget(weekly_view)
     
     def show_monthly(self):
-        self.stack.setCurrentWidget(self.monthly_view)
+        self.stack.setCurrentWidget(self.view("monthly"))
+    
+    def show_search(self):
+        search_view = self.view("search")
+        self.stack.setCurrentWidget(search_view)
+        search_view.query_edit.setFocus()
+    
+    def open_date(self, day_str):
+        # 검색 결과 등에서 특정 날짜의 일간 입력 화면으로 이동합니다.
+        self.daily_view.show_date(day_str)
+        self.stack.setCurrentWidget(self.daily_view)
+    
+    def show_week_of(self, day_str):
+        weekly_view = self.view("weekly")
+        weekly_view.show_week(day_str)
+        self.stack.setCurrentWidget(weekly_view)
+    
+    def import_data(self):
+        option, ok = QInputDialog.getItem(self, "불러오기 옵션 선택", "옵션:",
+                                          ("엑셀 백업", "자동 백업 스냅샷", "활동 파일 (GPX/TCX)"), 0, False)
+        if ok and option:
+            if option == "엑셀 백업":
+                import_backup_data(self.data_manager)
+            elif option == "자동 백업 스냅샷":
+                restore_snapshot(self.data_manager, self, self.session.backup_directory)
+            else:
+                directory = QFileDialog.getExistingDirectory(self, "활동 파일 폴더 선택")
+                if directory:
+                    import_activity_files(self.data_manager, [directory], self)
+    
+    def dropped_activity_paths(self, event):
+        # 끌어 온 것 중 폴더와 GPX/TCX 파일 경로
+        if not event.mimeData().hasUrls():
+            return []
+        paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        return [path for path in paths if os.path.isdir(path) or path.lower().endswith((".gpx", ".tcx"))]
+    
+    def dragEnterEvent(self, event):
+        if self.dropped_activity_paths(event):
+            event.acceptProposedAction()
+    
+    def dropEvent(self, event):
+        paths = self.dropped_activity_paths(event)
+        if paths:
+            event.acceptProposedAction()
+            import_activity_files(self.data_manager, paths, self)
     
     def export_data(self):
-        option, ok = QInputDialog.getItem(self, "내보내기 옵션 선택", "옵션:", ("주간", "월간", "백업"), 0, False)
+        option, ok = QInputDialog.getItem(self, "내보내기 옵션 선택", "옵션:", ("주간", "월간", "기간 일괄", "백업"), 0, False)
         if ok and option:
             if option == "백업":
                 export_to_excel_backup(self.data_manager)
+            elif option == "기간 일괄":
+                export_period_range(self.data_manager, self)
             elif option == "주간":
-                export_view_as_image(self.weekly_view)
+                export_view_as_image(self.view("weekly"))
             elif option == "월간":
-                export_view_as_image(self.monthly_view)
+                export_view_as_image(self.view("monthly"))
 
 #########################
 # 프로그램 실행
 #########################
 if __name__ == "__main__":
+    # 패키징된 앱에서 렌더링용 자식 프로세스가 다시 창을 띄우지 않도록 합니다.
+    multiprocessing.freeze_support()
+    if os.environ.get("TRAINING_LOG_PROFILE"):
+        profiler.set_enabled(True)
     app = QApplication(sys.argv)
     app.setFont(QFont("AppleSDGothicNeo", 10))
+    mark_startup("qapp")
+    instance_lock = acquire_instance_lock()
+    if instance_lock is None:
+        # WAL 모드라 두 인스턴스가 동시에 써도 DB 가 깨지지는 않지만, 같은 날을 서로 덮어쓸 수 있습니다.
+        answer = QMessageBox.question(
+            None, "훈련 일지", "훈련 일지가 이미 실행 중입니다.\n그래도 새 창을 여시겠습니까?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
+        if answer != QMessageBox.Yes:
+            sys.exit(0)
     mainWin = MainWindow()
+    mark_startup("construct")
     mainWin.show()
+
+    def on_first_paint():
+        mark_startup("first paint")
+        report_startup()
+
+    # 이벤트 루프의 첫 차례는 첫 화면을 그린 뒤에 옵니다.
+    QTimer.singleShot(0, on_first_paint)
     sys.exit(app.exec_())
\ No newline at end of file
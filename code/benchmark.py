@@ -0,0 +1,156 @@
+import os, sys, json, time, random, tempfile, argparse, statistics, platform, sqlite3
+from datetime import date, timedelta
+
+import core
+
+#########################
+# 데이터 계층 벤치마크
+# - 1/5/20년치 가상 훈련 일지를 DataManager.save_log 로 만들고 주요 조회/가져오기/내보내기 시간을 잽니다.
+# - Qt 를 불러오지 않는 core 만 쓰므로 화면 없이 실행되며, 결과는 JSON 으로 저장하고 기준 결과와 비교합니다.
+#
+#   python benchmark.py --years 1 5 --output bench.json
+#   python benchmark.py --save-baseline benchmark_baseline.json
+#   python benchmark.py --baseline benchmark_baseline.json --tolerance 0.25
+#########################
+RUN_TYPES = ["조깅", "지속주", "윈드 스프린트", "LSD", "가속주", "언덕 훈련", "인터벌", "TT", "크로스컨트리"]
+WORDS = ["오늘", "컨디션", "좋음", "다리가", "무거웠다", "페이스", "유지", "바람", "많이", "불었다",
+         "회복", "스트레칭", "필요", "인터벌", "마지막", "세트", "힘들었다", "수면", "부족", "가벼운"]
+
+def synthetic_log(rng, d):
+    sessions = []
+    for _ in range(rng.choice([0, 1, 1, 2, 3])):
+        ttype = rng.choice(RUN_TYPES)
+        session = {"type": ttype, "pace_min": str(rng.randint(3, 6)), "pace_sec": str(rng.randint(0, 59))}
+        if ttype in ["언덕 훈련", "인터벌"]:
+            session["m"] = str(rng.choice([200, 400, 800, 1000]))
+            session["count"] = str(rng.randint(4, 12))
+        else:
+            session["value"] = f"{rng.uniform(3, 25):.1f}"
+        sessions.append(session)
+    bedtime_min = rng.randint(22 * 60, 24 * 60 + 60) % (24 * 60)
+    sleep_min = rng.randint(300, 540)
+    wakeup_min = (bedtime_min + sleep_min) % (24 * 60)
+    return {
+        'date': d.strftime("%Y-%m-%d"),
+        'running_training': json.dumps(sessions, ensure_ascii=False),
+        'strength_training': " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 8))),
+        'morning_heart_rate': rng.randint(42, 65),
+        'fasting_weight': rng.choice([0, rng.randint(58, 66)]),
+        'bedtime': f"{bedtime_min // 60:02d}:{bedtime_min % 60:02d}",
+        'wakeup_time': f"{wakeup_min // 60:02d}:{wakeup_min % 60:02d}",
+        'sleep_time': sleep_min / 60.0,
+        'bowel': rng.choice(["O", "X", ""]),
+        'meal_breakfast': rng.choice(["밥", "빵", "시리얼", ""]),
+        'meal_lunch': rng.choice(["면", "밥", "샐러드"]),
+        'meal_dinner': rng.choice(["고기", "생선", "밥"]),
+        'meal_snack': rng.choice(["", "과일", "에너지바"]),
+        'comment': " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120)))
+    }
+
+def generate_database(db_path, years, seed=0):
+    rng = random.Random(seed)
+    data_manager = core.DataManager(db_path)
+    end = date(2025, 12, 31)
+    start = end - timedelta(days=365 * years - 1)
+    d = start
+    while d <= end:
+        data_manager.save_log(synthetic_log(rng, d))
+        d += timedelta(days=1)
+    return data_manager, start, end
+
+def measure(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": statistics.median(times), "min_ms": min(times), "mean_ms": statistics.mean(times), "repeat": repeat}
+
+def run_dataset(years, work_dir, repeat):
+    db_path = os.path.join(work_dir, f"bench_{years}y.db")
+    started = time.perf_counter()
+    data_manager, start, end = generate_database(db_path, years)
+    results = {"generate_save_log_ms": (time.perf_counter() - started) * 1000, "days": (end - start).days + 1}
+    rng = random.Random(1)
+    days = [(start + timedelta(days=rng.randrange((end - start).days + 1))).strftime("%Y-%m-%d") for _ in range(200)]
+    run_json = [row[0] for row in data_manager.conn.execute("SELECT running_training FROM logs LIMIT 500")]
+    monday = end - timedelta(days=end.weekday())
+    ops = {
+        "get_log_by_date_x200": lambda: [data_manager.get_log_by_date(d) for d in days],
+        "get_previous_weight_x200": lambda: [data_manager.get_previous_weight(d) for d in days],
+        "get_logs_between_week": lambda: data_manager.get_logs_between(monday.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")),
+        "get_logs_between_year": lambda: data_manager.get_logs_between((end - timedelta(days=364)).strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")),
+        "get_all_logs": data_manager.get_all_logs,
+        "parse_running_training_km_x500": lambda: [core.parse_running_training_km(j) for j in run_json],
+    }
+    for name, fn in ops.items():
+        results[name] = measure(fn, repeat)
+    # 백업 내보내기/가져오기는 앱의 작업 스레드와 명령줄 도구가 쓰는 core 함수를 그대로 잽니다.
+    xlsx_path = os.path.join(work_dir, f"bench_{years}y.xlsx")
+    csv_path = os.path.join(work_dir, f"bench_{years}y.csv")
+    ndjson_path = os.path.join(work_dir, f"bench_{years}y.ndjson")
+    results["export_xlsx"] = measure(lambda: core.export_backup(data_manager, xlsx_path), 1)
+    results["export_csv"] = measure(lambda: core.export_backup(data_manager, csv_path), 1)
+    results["export_ndjson"] = measure(lambda: core.export_backup(data_manager, ndjson_path), 1)
+    import_manager = core.DataManager(os.path.join(work_dir, f"bench_{years}y_import.db"))
+    results["import_xlsx"] = measure(lambda: core.import_backup(import_manager, xlsx_path), 1)
+    results["import_ndjson"] = measure(lambda: core.import_backup(import_manager, ndjson_path), 1)
+    import_manager.conn.close()
+    data_manager.conn.close()
+    return results
+
+def compare(results, baseline, tolerance):
+    # 기준보다 median 이 tolerance 비율 이상 느려진 항목 목록
+    regressions = []
+    for dataset, ops in results["datasets"].items():
+        for name, value in ops.items():
+            base = baseline.get("datasets", {}).get(dataset, {}).get(name)
+            if not isinstance(value, dict) or not isinstance(base, dict):
+                continue
+            if value["median_ms"] > base["median_ms"] * (1 + tolerance):
+                regressions.append((dataset, name, base["median_ms"], value["median_ms"]))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="훈련 일지 데이터 계층 벤치마크")
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--repeat", type=int, default=5)
+    # 어디서 실행해도 결과가 .gitignore 에 있는 code/benchmark_results.json 에 쓰이도록 스크립트 옆을 기본값으로 합니다.
+    parser.add_argument("--output", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_results.json"))
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--save-baseline", help="이번 결과를 기준 결과로 저장할 경로")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용하는 느려짐 비율 (기본 25%%)")
+    args = parser.parse_args(argv)
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "datasets": {},
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        for years in args.years:
+            print(f"{years}년치 데이터 생성 및 측정 중...", file=sys.stderr)
+            results["datasets"][f"{years}y"] = run_dataset(years, work_dir, args.repeat)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    for dataset, ops in results["datasets"].items():
+        for name, value in ops.items():
+            if isinstance(value, dict):
+                print(f"{dataset:>4} {name:<32}{value['median_ms']:10.2f} ms")
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for dataset, name, base, value in regressions:
+            print(f"느려짐: {dataset} {name} {base:.2f} ms -> {value:.2f} ms", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
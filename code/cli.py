@@ -0,0 +1,222 @@
+import os, sys, json, time, sqlite3, argparse
+
+import core
+
+#########################
+# 명령줄 도구 (화면 없이 실행)
+# - Qt 를 불러오지 않는 core 만 쓰므로 QApplication 을 만들지 않고 바로 시작합니다.
+# - 가져오기/내보내기는 파일과 DB 를 배치 단위로 스트리밍하므로 몇십 년치 기록도 메모리 사용량이 일정합니다.
+#
+#   python cli.py import backup.xlsx
+#   python cli.py export nightly.ndjson
+#   python cli.py --db other.db export logs.csv --format csv
+#   python cli.py stats --from 2025-01-01 --by month
+#   python cli.py vacuum
+#   python cli.py athletes --add 김선수
+#   python cli.py athletes --rename 김선수 김철수
+#   python cli.py --athlete 김선수 export kim.xlsx
+#   python cli.py team --weeks 12 --json
+#   python cli.py ingest ~/watch-export --type LSD
+#########################
+def progress_printer(label):
+    # 진행 상황은 stderr 에 한 줄로 덮어써서 stdout 출력(통계 JSON 등)과 섞이지 않게 합니다.
+    if not sys.stderr.isatty():
+        return None
+    def report(done, total, rate):
+        count = f"{done}/{total}" if total else str(done)
+        print(f"\r{label}: {count}행 ({rate:.0f}행/초)", end="", file=sys.stderr, flush=True)
+    return report
+
+def command_import(data_manager, args):
+    started = time.perf_counter()
+    imported = core.import_backup(data_manager, args.file, args.format, progress=progress_printer("가져오는 중"))
+    print(f"\r{imported}행을 가져왔습니다 ({time.perf_counter() - started:.2f}초).", file=sys.stderr)
+    return 0
+
+def command_export(data_manager, args):
+    started = time.perf_counter()
+    exported = core.export_backup(data_manager, args.file, args.format, progress=progress_printer("내보내는 중"))
+    print(f"\r{exported}행을 내보냈습니다: {args.file} ({time.perf_counter() - started:.2f}초)", file=sys.stderr)
+    return 0
+
+def format_pace(seconds):
+    if not seconds:
+        return "-"
+    minutes, sec = divmod(int(round(seconds)), 60)
+    return f"{minutes}'{sec:02d}''"
+
+def format_number(value, digits=1):
+    return "-" if value is None else f"{value:.{digits}f}"
+
+def format_duration(seconds):
+    minutes, sec = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{sec:02d}" if hours else f"{minutes}:{sec:02d}"
+
+def command_ingest(data_manager, args):
+    # 활동 파일 분석은 프로세스 풀에서 하므로 numpy 를 쓰는 activity 는 이 명령에서만 불러옵니다.
+    import activity
+    started = time.perf_counter()
+    result = activity.ingest_activities(data_manager, args.paths, args.type, workers=args.workers,
+                                        progress=progress_printer("분석 중"))
+    elapsed = time.perf_counter() - started
+    for summary in sorted(result["imported"], key=lambda s: s["started_at"]):
+        splits = " ".join(format_pace(split["sec"] / split["km"]) for split in summary["splits"])
+        print(f"{summary['started_at']}  {summary['km']:>6.2f}km  {format_duration(summary['moving_sec']):>8}  "
+              f"{format_pace(summary['pace_sec']):>7}  {summary['file']}")
+        if splits:
+            print(f"    구간: {splits}")
+    for file_name, error in result["errors"].items():
+        print(f"오류: {file_name}: {error}", file=sys.stderr)
+    print(f"\r{len(result['imported'])}개 파일을 가져왔습니다 (건너뜀 {result['skipped']}개, 오류 {len(result['errors'])}개, "
+          f"{elapsed:.2f}초).", file=sys.stderr)
+    return 1 if result["errors"] else 0
+
+def command_stats(data_manager, args):
+    # 기간별 값은 저장할 때마다 갱신되는 period_summaries 를 읽고, 합계는 한 번의 집계 쿼리로 구합니다.
+    periods = []
+    for key, start, end, km, run_days, heart_rate, sleep, weight_change in data_manager.get_period_summaries(args.by):
+        if (args.start and end < args.start) or (args.end and start > args.end):
+            continue
+        periods.append({"period": key, "start_date": start, "end_date": end, "total_km": km, "run_days": run_days,
+                        "avg_heart_rate": heart_rate, "avg_sleep": sleep, "weight_change": weight_change})
+    total = data_manager.get_stats(args.start, args.end)
+    if args.json:
+        json.dump({"periods": periods, "total": total}, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+    print(f"{'기간':<10}{'거리(km)':>10}{'러닝일':>8}{'심박':>8}{'수면':>8}{'체중 변화':>10}")
+    for p in periods:
+        print(f"{p['period']:<10}{p['total_km']:>10.1f}{p['run_days']:>8}{format_number(p['avg_heart_rate']):>8}"
+              f"{format_number(p['avg_sleep']):>8}{format_number(p['weight_change'], 0):>10}")
+    if not total["days"]:
+        print("기록이 없습니다.")
+        return 0
+    print()
+    print(f"기간 {total['first_date']} ~ {total['last_date']} ({total['days']}일 기록)")
+    print(f"거리 {total['total_km']:.1f}km, 러닝 {total['run_days']}일 {total['session_count']}회, "
+          f"평균 페이스 {format_pace(total['avg_pace_sec'])}")
+    print(f"평균 아침 심박 {format_number(total['avg_heart_rate'])}, 평균 체중 {format_number(total['avg_weight'])}kg, "
+          f"평균 수면 {format_number(total['avg_sleep'])}시간")
+    return 0
+
+def database_size(db_path):
+    return sum(os.path.getsize(path) for path in (db_path, db_path + "-wal") if os.path.exists(path))
+
+def command_vacuum(data_manager, args):
+    before = database_size(data_manager.db_path)
+    started = time.perf_counter()
+    data_manager.vacuum()
+    after = database_size(data_manager.db_path)
+    print(f"{before / 1024:.0f}KB -> {after / 1024:.0f}KB ({time.perf_counter() - started:.2f}초)", file=sys.stderr)
+    return 0
+
+def command_athletes(registry, args):
+    if args.add:
+        registry.add(args.add)
+    if args.rename:
+        registry.rename(registry.find(args.rename[0]), args.rename[1])
+    if args.remove:
+        registry.remove(registry.find(args.remove))
+    for athlete_id, name, db_path in registry.athletes():
+        print(f"{athlete_id:>4}  {name:<12}{db_path}")
+    return 0
+
+def command_team(registry, args):
+    athletes = registry.athletes()
+    started = time.perf_counter()
+    report = core.aggregate_team(athletes, args.weeks)
+    elapsed = time.perf_counter() - started
+    if args.json:
+        # JSON 키는 문자열이어야 하므로 선수 id 대신 이름을 씁니다.
+        names = {athlete_id: name for athlete_id, name, _ in athletes}
+        json.dump({
+            "weeks": report["weeks"],
+            "team_km": report["team_km"],
+            "mileage": {names[athlete_id]: weeks for athlete_id, weeks in report["mileage"].items()},
+            "alerts": [{"athlete": names[athlete_id], "recent": recent, "baseline": baseline}
+                       for athlete_id, recent, baseline, _ in report["alerts"]],
+            "errors": {names[athlete_id]: error for athlete_id, error in report["errors"].items()},
+        }, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 1 if report["errors"] else 0
+    print(f"{'선수':<12}" + "".join(f"{key[-3:]:>8}" for key in report["weeks"]) + f"{'합계':>10}")
+    for athlete_id, name, _ in athletes:
+        if athlete_id in report["errors"]:
+            print(f"{name:<12}오류: {report['errors'][athlete_id]}")
+            continue
+        mileage = report["mileage"].get(athlete_id, {})
+        print(f"{name:<12}" + "".join(f"{mileage.get(key) or 0:>8.1f}" for key in report["weeks"])
+              + f"{sum(km or 0 for km in mileage.values()):>10.1f}")
+    print(f"{'팀 합계':<12}" + "".join(f"{report['team_km'][key]:>8.1f}" for key in report["weeks"])
+          + f"{sum(report['team_km'].values()):>10.1f}")
+    names = {athlete_id: name for athlete_id, name, _ in athletes}
+    for athlete_id, recent, baseline, diff in report["alerts"]:
+        print(f"심박 경고: {names[athlete_id]} 최근 {core.HR_RECENT_DAYS}일 {recent:.1f} (평소 {baseline:.1f}, +{diff:.1f})")
+    print(f"{len(athletes)}명 집계 ({elapsed * 1000:.0f} ms)", file=sys.stderr)
+    # 읽지 못한 선수가 있으면 스크립트에서 알 수 있도록 실패로 끝냅니다.
+    return 1 if report["errors"] else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="훈련 일지 명령줄 도구")
+    parser.add_argument("--db", help="DB 파일 경로 (기본: 사용자 데이터 폴더의 training_log.db)")
+    parser.add_argument("--athlete", help="선수 이름 (선수 등록부에서 DB 를 찾습니다)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("import", "백업 파일을 가져옵니다"), ("export", "백업 파일로 내보냅니다")):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("file")
+        sub.add_argument("--format", choices=core.BACKUP_FORMATS, help="파일 형식 (기본: 확장자로 판단)")
+
+    stats = commands.add_parser("stats", help="기간별 요약과 전체 통계를 출력합니다")
+    stats.add_argument("--from", dest="start", help="시작 날짜 (yyyy-MM-dd)")
+    stats.add_argument("--to", dest="end", help="끝 날짜 (yyyy-MM-dd)")
+    stats.add_argument("--by", choices=["year", "month", "week"], default="month")
+    stats.add_argument("--json", action="store_true", help="JSON 으로 출력")
+
+    ingest = commands.add_parser("ingest", help="GPX/TCX 활동 파일(또는 폴더)을 러닝 세션으로 가져옵니다")
+    ingest.add_argument("paths", nargs="+", metavar="PATH")
+    ingest.add_argument("--type", default="조깅", help="세션 종류 (기본: 조깅)")
+    ingest.add_argument("--workers", type=int, help="분석 프로세스 수 (기본: CPU 수)")
+
+    commands.add_parser("vacuum", help="검색 색인을 정리하고 DB 파일을 압축합니다")
+
+    athletes = commands.add_parser("athletes", help="등록된 선수 목록을 출력합니다")
+    athletes.add_argument("--add", metavar="NAME", help="선수를 추가합니다")
+    athletes.add_argument("--rename", nargs=2, metavar=("NAME", "NEW_NAME"), help="선수 이름을 바꿉니다")
+    athletes.add_argument("--remove", metavar="NAME", help="선수 등록을 지웁니다 (DB 파일은 남겨 둡니다)")
+
+    team = commands.add_parser("team", help="모든 선수의 주간 거리와 아침 심박 경고를 출력합니다")
+    team.add_argument("--weeks", type=int, default=8)
+    team.add_argument("--json", action="store_true", help="JSON 으로 출력")
+    args = parser.parse_args(argv)
+
+    handlers = {"import": command_import, "export": command_export, "stats": command_stats, "vacuum": command_vacuum,
+                "ingest": command_ingest}
+    registry_handlers = {"athletes": command_athletes, "team": command_team}
+    registry = None
+    data_manager = None
+    try:
+        if args.command in registry_handlers:
+            registry = core.AthleteRegistry()
+            return registry_handlers[args.command](registry, args)
+        if args.athlete:
+            # 선수 이름으로 DB 만 찾으므로 등록부를 읽기 전용으로 열고, 없으면 만들지 않고 실패합니다.
+            if not os.path.exists(core.registry_path()):
+                raise KeyError(f"등록되지 않은 선수입니다: {args.athlete}")
+            registry = core.AthleteRegistry(read_only=True)
+        db_path = registry.get(registry.find(args.athlete))[2] if args.athlete else args.db or core.default_db_path()
+        data_manager = core.DataManager(db_path)
+        return handlers[args.command](data_manager, args)
+    except (OSError, ValueError, KeyError, sqlite3.Error) as e:
+        # KeyError 는 str() 이 따옴표를 붙이므로 메시지만 꺼냅니다.
+        print(f"\n오류: {e.args[0] if isinstance(e, KeyError) else e}", file=sys.stderr)
+        return 1
+    finally:
+        if data_manager is not None:
+            data_manager.conn.close()
+        if registry is not None:
+            registry.conn.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1461 @@
+import os, sys, sqlite3, json, time, csv, threading, html, gzip, shutil
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import pathname2url
+from datetime import datetime, timedelta, date
+
+#########################
+# 훈련 일지 코어 (Qt 를 불러오지 않습니다)
+# - DataManager, 러닝 기록 파싱, 백업 가져오기/내보내기, DB 스냅샷처럼 화면과 상관없는 기능을 모았습니다.
+# - 앱(app.py), 명령줄 도구(cli.py), 벤치마크가 함께 사용합니다. openpyxl 과 analytics(numpy)는 쓸 때 불러옵니다.
+#########################
+
+#########################
+# 성능 계측 (기본값 꺼짐)
+# - DataManager 메서드별 호출 수/지연 시간 분포/반환 행 수, 실제 실행된 SQL, 화면 그리기 구간을 기록합니다.
+# - 꺼져 있을 때는 플래그 확인 한 번만 하므로 부담이 거의 없습니다.
+# - TRAINING_LOG_PROFILE=<파일.json> 으로 켜면 종료 시 Chrome trace 형식(chrome://tracing)으로 저장합니다.
+# - 앱에서는 Ctrl+Shift+D 로 숨겨진 디버그 패널을 열 수 있습니다.
+#########################
+LATENCY_BUCKETS_MS = [0.1, 1, 10, 100]
+MAX_TRACE_EVENTS = 200000
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NULL_SPAN = NullSpan()
+
+class Span:
+    def __init__(self, profiler, name, category):
+        self.profiler = profiler
+        self.name = name
+        self.category = category
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.category, self.name, self.started, time.perf_counter())
+        return False
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            # 이름 -> [호출 수, 총 시간(ms), 반환 행 수, 지연 시간 구간별 개수]
+            self.stats = {}
+            self.sql_counts = {}
+            self.events = []
+
+    def set_enabled(self, enabled):
+        self.enabled = enabled
+
+    def span(self, name, category="ui"):
+        return Span(self, name, category) if self.enabled else NULL_SPAN
+
+    def record(self, category, name, started, ended, rows=None):
+        elapsed_ms = (ended - started) * 1000
+        with self.lock:
+            stat = self.stats.setdefault(name, [0, 0.0, 0, [0] * (len(LATENCY_BUCKETS_MS) + 1)])
+            stat[0] += 1
+            stat[1] += elapsed_ms
+            stat[2] += rows or 0
+            bucket = next((i for i, limit in enumerate(LATENCY_BUCKETS_MS) if elapsed_ms < limit), len(LATENCY_BUCKETS_MS))
+            stat[3][bucket] += 1
+            if len(self.events) < MAX_TRACE_EVENTS:
+                event = {"name": name, "cat": category, "ph": "X", "pid": os.getpid(),
+                         "tid": threading.get_ident(), "ts": (started - self.origin) * 1e6,
+                         "dur": (ended - started) * 1e6}
+                if rows is not None:
+                    event["args"] = {"rows": rows}
+                self.events.append(event)
+
+    def record_sql(self, statement):
+        # sqlite3 set_trace_callback 에서 호출됩니다. 같은 SQL 은 공백을 정리해 함께 셉니다.
+        sql = " ".join(statement.split())
+        with self.lock:
+            self.sql_counts[sql] = self.sql_counts.get(sql, 0) + 1
+            if len(self.events) < MAX_TRACE_EVENTS:
+                self.events.append({"name": "sql", "cat": "sql", "ph": "i", "s": "t", "pid": os.getpid(),
+                                    "tid": threading.get_ident(), "ts": (time.perf_counter() - self.origin) * 1e6,
+                                    "args": {"sql": sql[:500]}})
+
+    def summary(self):
+        with self.lock:
+            lines = ["이름                                       호출     총(ms)   평균(ms)     행   <0.1 <1 <10 <100 >=100ms"]
+            for name, (calls, total, rows, buckets) in sorted(self.stats.items(), key=lambda kv: -kv[1][1]):
+                lines.append(f"{name:<40}{calls:>7}{total:>11.1f}{total / calls:>11.3f}{rows:>7}   "
+                             + " ".join(str(b) for b in buckets))
+            lines.append("")
+            lines.append("SQL (실행 횟수순)")
+            for sql, count in sorted(self.sql_counts.items(), key=lambda kv: -kv[1])[:30]:
+                lines.append(f"{count:>7}  {sql[:160]}")
+            return "\n".join(lines)
+
+    def dump_chrome_trace(self, file_name):
+        with self.lock:
+            data = {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+        with open(file_name, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+profiler = Profiler()
+
+def traced(name):
+    # 화면 그리기/내보내기 함수의 실행 구간을 기록하는 데코레이터
+    def decorator(fn):
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return fn(*args, **kwargs)
+            with Span(profiler, name, "ui"):
+                return fn(*args, **kwargs)
+        wrapper.__name__ = fn.__name__
+        return wrapper
+    return decorator
+
+def profiled(method):
+    # DataManager 메서드용. 연결을 만든 스레드 안에서 실행되므로 여기서 SQL 추적을 켜고 끕니다.
+    name = "DataManager." + method.__name__
+
+    def wrapper(self, *args, **kwargs):
+        if not profiler.enabled:
+            if self.sql_traced:
+                self.conn.set_trace_callback(None)
+                self.sql_traced = False
+            return method(self, *args, **kwargs)
+        if not self.sql_traced:
+            self.conn.set_trace_callback(profiler.record_sql)
+            self.sql_traced = True
+        started = time.perf_counter()
+        result = method(self, *args, **kwargs)
+        if isinstance(result, list):
+            rows = len(result)
+        else:
+            rows = 0 if result is None else 1
+        profiler.record("db", name, started, time.perf_counter(), rows)
+        return result
+
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+#########################
+# 데이터베이스 연결 관리
+# - DB 는 현재 폴더가 아니라 사용자별 데이터 폴더에 둡니다 (TRAINING_LOG_HOME 으로 바꿀 수 있음).
+# - WAL 모드로 읽기가 쓰기를 기다리지 않게 하고, synchronous=NORMAL 로 저장마다의 fsync 를 줄입니다.
+#########################
+DB_FILE_NAME = "training_log.db"
+STATEMENT_CACHE_SIZE = 256
+
+def data_dir(create=True):
+    custom = os.environ.get("TRAINING_LOG_HOME")
+    if custom:
+        path = custom
+    elif sys.platform == "darwin":
+        path = os.path.expanduser("~/Library/Application Support/Training Log")
+    elif sys.platform.startswith("win"):
+        path = os.path.join(os.environ.get("APPDATA", os.path.expanduser("~")), "Training Log")
+    else:
+        path = os.path.join(os.environ.get("XDG_DATA_HOME", os.path.expanduser("~/.local/share")), "training-log")
+    if create:
+        os.makedirs(path, exist_ok=True)
+    return path
+
+def default_db_path():
+    path = os.path.join(data_dir(), DB_FILE_NAME)
+    # 이전 버전은 실행 폴더에 DB 를 만들었으므로, 새 위치에 DB 가 없으면 한 번 복사해 옵니다.
+    legacy = os.path.abspath(DB_FILE_NAME)
+    if not os.path.exists(path) and os.path.exists(legacy) and legacy != os.path.abspath(path):
+        source = sqlite3.connect(legacy)
+        target = sqlite3.connect(path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    return path
+
+def connect_database(db_path, read_only=False):
+    if read_only:
+        uri = "file:" + pathname2url(os.path.abspath(db_path)) + "?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, timeout=10, cached_statements=STATEMENT_CACHE_SIZE)
+    else:
+        conn = sqlite3.connect(db_path, timeout=10, cached_statements=STATEMENT_CACHE_SIZE)
+        # journal_mode 는 DB 파일에 기록되므로 쓰기 연결에서만 설정합니다.
+        conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA cache_size = -16000")
+    conn.execute("PRAGMA mmap_size = 268435456")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+#########################
+# 수치 기록 저장소 (메모리)
+# - logs 의 숫자 컬럼을 열마다 (날짜 ordinal, 값) 두 개의 array 로 들고 있으며, 값이 있는 날만 날짜순으로 담습니다.
+# - "X 이전의 마지막 값" 은 이진 탐색으로 찾으므로 체중을 건너뛴 날이 있어도 쿼리 없이 직전 체중과 비교합니다.
+# - 한 번 전체를 읽은 뒤에는 방금 저장한 값으로 그 날짜만 고칩니다 (DataManager.notify_saved).
+#   앱에서는 읽기 스레드에서 만들어 메인 스레드로 넘기므로(AsyncDataManager.load_metrics) 화면이 전체 조회를 기다리지 않습니다.
+#########################
+METRIC_COLUMNS = ["morning_heart_rate", "fasting_weight", "sleep_time", "total_km"]
+
+def day_ordinal(day_str):
+    try:
+        return date.fromisoformat(day_str).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+class MetricStore:
+    def __init__(self):
+        # 열 이름 -> (날짜 ordinal 배열, 값 배열). 0 과 빈 값은 기록하지 않은 것으로 봅니다.
+        self.columns = {name: (array("l"), array("d")) for name in METRIC_COLUMNS}
+
+    def load(self, conn, start_date=None, end_date=None):
+        # start_date/end_date 를 주면 그 기간과, 기간 전의 마지막 값(열마다 하나)만 읽습니다.
+        # 그 기간 안의 날짜에 대한 previous()/value_on() 만 쓰는 경우(이미지 내보내기의 한 쪽)에 씁니다.
+        self.columns = {name: (array("l"), array("d")) for name in METRIC_COLUMNS}
+        c = conn.cursor()
+        if start_date is None:
+            c.execute(f"SELECT date, {', '.join(METRIC_COLUMNS)} FROM logs ORDER BY date")
+            self.append_rows(c)
+            return
+        for i, name in enumerate(METRIC_COLUMNS):
+            c.execute(f"""SELECT date, {name} FROM logs WHERE date < ? AND {name} > 0 AND {name} != ''
+                          ORDER BY date DESC LIMIT 1""", (start_date,))
+            row = c.fetchone()
+            if row is not None:
+                self.append_rows([(row[0],) + (None,) * i + (row[1],) + (None,) * (len(METRIC_COLUMNS) - i - 1)])
+        c.execute(f"SELECT date, {', '.join(METRIC_COLUMNS)} FROM logs WHERE date BETWEEN ? AND ? ORDER BY date",
+                  (start_date, end_date))
+        self.append_rows(c)
+
+    def append_rows(self, rows):
+        # (날짜, METRIC_COLUMNS 값...) 행을 날짜순으로 받아 뒤에 덧붙입니다.
+        for row in rows:
+            ordinal = day_ordinal(row[0])
+            if ordinal is None:
+                continue
+            for (ordinals, values), value in zip(self.columns.values(), row[1:]):
+                value = to_number(value, float) if value is not None else None
+                if value:
+                    ordinals.append(ordinal)
+                    values.append(value)
+
+    def update_day(self, log_date, fields):
+        # fields: 저장한 컬럼 값 dict (update_fields 처럼 일부만 있어도 됩니다). 쿼리 없이 그 값으로 고칩니다.
+        ordinal = day_ordinal(log_date)
+        if ordinal is None:
+            return
+        saved = {name: fields[name] for name in METRIC_COLUMNS if name in fields}
+        if "running_training" in fields:
+            saved["total_km"] = compute_running_totals(fields["running_training"] or "[]")[0]
+        for name, value in saved.items():
+            ordinals, values = self.columns[name]
+            value = to_number(value, float) if value is not None else None
+            i = bisect_left(ordinals, ordinal)
+            present = i < len(ordinals) and ordinals[i] == ordinal
+            if value:
+                if present:
+                    values[i] = value
+                else:
+                    ordinals.insert(i, ordinal)
+                    values.insert(i, value)
+            elif present:
+                del ordinals[i]
+                del values[i]
+
+    def value_on(self, name, day_str):
+        ordinals, values = self.columns[name]
+        ordinal = day_ordinal(day_str)
+        i = bisect_left(ordinals, ordinal) if ordinal is not None else len(ordinals)
+        return values[i] if i < len(ordinals) and ordinals[i] == ordinal else None
+
+    def previous(self, name, day_str):
+        # day_str 이전(당일 제외)에 기록된 가장 최근 값. 없으면 None.
+        ordinals, values = self.columns[name]
+        ordinal = day_ordinal(day_str)
+        if ordinal is None:
+            return None
+        i = bisect_left(ordinals, ordinal)
+        return values[i - 1] if i else None
+
+    def next_day(self, name, day_str):
+        # day_str 다음(당일 제외)에 값이 기록된 첫 날짜 문자열. 없으면 None.
+        ordinals, _ = self.columns[name]
+        ordinal = day_ordinal(day_str)
+        if ordinal is None:
+            return None
+        i = bisect_right(ordinals, ordinal)
+        return date.fromordinal(ordinals[i]).strftime("%Y-%m-%d") if i < len(ordinals) else None
+
+#########################
+# 데이터베이스 매니저
+# - 스키마 버전은 PRAGMA user_version 으로 관리하며, 버전이 낮은 DB는 열 때 순서대로 마이그레이션합니다.
+#########################
+SCHEMA_VERSION = 4
+# date 를 제외한 일지 입력 컬럼 (update_fields 에서 쓸 수 있는 컬럼)
+LOG_FIELDS = [
+    "running_training", "strength_training", "morning_heart_rate", "fasting_weight",
+    "bedtime", "wakeup_time", "sleep_time", "bowel",
+    "meal_breakfast", "meal_lunch", "meal_dinner", "meal_snack", "comment"
+]
+# 일지 행을 인덱스로 읽는 곳(format_week_day 등)이 기대하는 열 순서. 예전 DB 에는 식사 시각 열이
+# 남아 있어 SELECT * 를 쓰면 순서가 밀리므로 열을 직접 나열합니다.
+LOG_COLUMNS = "id, date, " + ", ".join(LOG_FIELDS) + ", total_km, session_count, avg_pace_sec"
+
+class DataManager:
+    def __init__(self, db_path=None, read_only=False):
+        self.db_path = db_path or default_db_path()
+        self.save_listeners = []
+        self.sql_traced = False
+        self.metric_store = None
+        self.conn = connect_database(self.db_path, read_only)
+        if read_only:
+            # 읽기 전용 연결은 스키마를 건드리지 않습니다 (AsyncDataManager 의 읽기 스레드용).
+            return
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.create_table()
+    
+    def create_table(self):
+        c = self.conn.cursor()
+        c.execute("BEGIN")
+        # 식사 시각 정보는 제거되었습니다.
+        c.execute('''CREATE TABLE IF NOT EXISTS logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date TEXT UNIQUE,
+            running_training TEXT,
+            strength_training TEXT,
+            morning_heart_rate INTEGER,
+            fasting_weight INTEGER,
+            bedtime TEXT,
+            wakeup_time TEXT,
+            sleep_time REAL,
+            bowel TEXT,
+            meal_breakfast TEXT,
+            meal_lunch TEXT,
+            meal_dinner TEXT,
+            meal_snack TEXT,
+            comment TEXT,
+            total_km REAL,
+            session_count INTEGER,
+            avg_pace_sec REAL
+        )''')
+        c.execute('''CREATE TABLE IF NOT EXISTS running_sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            log_date TEXT NOT NULL REFERENCES logs(date) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            m INTEGER,
+            count INTEGER,
+            value REAL,
+            km REAL NOT NULL,
+            pace_sec INTEGER
+        )''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_running_sessions_date ON running_sessions(log_date)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_running_sessions_type_date ON running_sessions(type, log_date)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_running_sessions_pace ON running_sessions(pace_sec)")
+        # 가져온 활동 파일(GPX/TCX) - 파일 내용의 SHA-256 으로 다시 가져오기를 막고, km 구간 기록(JSON)을 둡니다.
+        c.execute('''CREATE TABLE IF NOT EXISTS activity_files (
+            hash TEXT PRIMARY KEY,
+            file_name TEXT NOT NULL,
+            log_date TEXT NOT NULL,
+            started_at TEXT,
+            km REAL,
+            moving_sec REAL,
+            splits TEXT,
+            imported_at TEXT NOT NULL
+        )''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_activity_files_date ON activity_files(log_date)")
+        # ISO 주/월/연 단위 요약 - save_logs 와 같은 트랜잭션에서 바뀐 기간만 다시 계산됩니다.
+        c.execute('''CREATE TABLE IF NOT EXISTS period_summaries (
+            period_type TEXT NOT NULL,
+            period_key TEXT NOT NULL,
+            start_date TEXT NOT NULL,
+            end_date TEXT NOT NULL,
+            total_km REAL,
+            run_days INTEGER,
+            avg_heart_rate REAL,
+            avg_sleep REAL,
+            weight_change INTEGER,
+            PRIMARY KEY (period_type, period_key)
+        )''')
+        c.execute("PRAGMA user_version")
+        version = c.fetchone()[0]
+        # (버전, 마이그레이션 함수) - 모두 하나의 트랜잭션 안에서 실행됩니다.
+        migrations = [
+            (1, self.migrate_running_totals),
+            (2, self.migrate_running_sessions),
+            (3, self.migrate_period_summaries),
+            (4, self.migrate_search_index),
+        ]
+        try:
+            for target, migrate in migrations:
+                if version < target:
+                    migrate()
+            c.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.conn.commit()
+        except:
+            self.conn.rollback()
+            raise
+    
+    def migrate_running_totals(self):
+        # 이전 버전 DB에 러닝 합계 컬럼을 추가하고 기존 행을 한 번에 채웁니다.
+        c = self.conn.cursor()
+        c.execute("PRAGMA table_info(logs)")
+        columns = [row[1] for row in c.fetchall()]
+        for name, col_type in [("total_km", "REAL"), ("session_count", "INTEGER"), ("avg_pace_sec", "REAL")]:
+            if name not in columns:
+                c.execute(f"ALTER TABLE logs ADD COLUMN {name} {col_type}")
+        c.execute("SELECT date, running_training FROM logs WHERE total_km IS NULL")
+        rows = c.fetchall()
+        if rows:
+            c.executemany(
+                "UPDATE logs SET total_km=?, session_count=?, avg_pace_sec=? WHERE date=?",
+                [compute_running_totals(run_json or "[]") + (log_date,) for log_date, run_json in rows])
+    
+    def migrate_running_sessions(self):
+        # logs.running_training JSON을 running_sessions 행으로 변환합니다.
+        c = self.conn.cursor()
+        c.execute("DELETE FROM running_sessions")
+        c.execute("SELECT date, running_training FROM logs WHERE date IS NOT NULL")
+        rows = []
+        for log_date, run_json in c.fetchall():
+            rows.extend((log_date,) + row for row in running_session_rows(run_json or "[]"))
+        c.executemany('''INSERT INTO running_sessions (log_date, position, type, m, count, value, km, pace_sec)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', rows)
+    
+    def migrate_period_summaries(self):
+        c = self.conn.cursor()
+        c.execute("SELECT date FROM logs WHERE date IS NOT NULL")
+        self.refresh_period_summaries([row[0] for row in c.fetchall()])
+    
+    def refresh_period_summaries(self, log_dates):
+        # 바뀐 날짜가 속한 주/월/연 기간만 logs 에서 다시 집계합니다. 커밋은 호출한 쪽에서 합니다.
+        buckets = set()
+        for log_date in log_dates:
+            try:
+                buckets.update(period_buckets(datetime.strptime(log_date, "%Y-%m-%d").date()))
+            except:
+                continue
+        c = self.conn.cursor()
+        for period_type, period_key, start, end in sorted(buckets):
+            c.execute("DELETE FROM period_summaries WHERE period_type=? AND period_key=?", (period_type, period_key))
+            c.execute('''
+                INSERT INTO period_summaries (period_type, period_key, start_date, end_date,
+                                              total_km, run_days, avg_heart_rate, avg_sleep, weight_change)
+                SELECT ?, ?, ?, ?,
+                       COALESCE(SUM(total_km), 0),
+                       COALESCE(SUM(total_km > 0), 0),
+                       AVG(NULLIF(morning_heart_rate, 0)),
+                       AVG(NULLIF(sleep_time, 0)),
+                       (SELECT fasting_weight FROM logs WHERE date BETWEEN ?3 AND ?4 AND fasting_weight > 0
+                        ORDER BY date DESC LIMIT 1)
+                       - (SELECT fasting_weight FROM logs WHERE date BETWEEN ?3 AND ?4 AND fasting_weight > 0
+                          ORDER BY date LIMIT 1)
+                FROM logs WHERE date BETWEEN ?3 AND ?4
+                HAVING COUNT(*) > 0
+            ''', (period_type, period_key, start, end))
+    
+    def get_period_summaries(self, period_type, start_key=None, end_key=None):
+        # period_type: "week" ("2025-W03"), "month" ("2025-01"), "year" ("2025")
+        query = '''SELECT period_key, start_date, end_date, total_km, run_days,
+                          avg_heart_rate, avg_sleep, weight_change
+                   FROM period_summaries WHERE period_type=?'''
+        params = [period_type]
+        if start_key is not None:
+            query += " AND period_key >= ?"
+            params.append(start_key)
+        if end_key is not None:
+            query += " AND period_key <= ?"
+            params.append(end_key)
+        c = self.conn.cursor()
+        c.execute(query + " ORDER BY period_key", params)
+        return c.fetchall()
+    
+    def migrate_search_index(self):
+        # 코멘트/보강 트레이닝/식사 전문 검색용 FTS5 테이블. 한글은 trigram 토크나이저로 부분 일치 검색합니다.
+        # FTS5 나 trigram 을 지원하지 않는 SQLite 에서는 search_logs 가 LIKE 검색으로 대신합니다.
+        c = self.conn.cursor()
+        columns = ", ".join(SEARCH_COLUMNS)
+        for tokenizer in ("trigram", "unicode61"):
+            try:
+                c.execute(f'''CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(
+                    {columns}, content='logs', content_rowid='id', tokenize='{tokenizer}')''')
+                break
+            except sqlite3.OperationalError:
+                continue
+        else:
+            return
+        new_values = ", ".join("new." + col for col in SEARCH_COLUMNS)
+        old_values = ", ".join("old." + col for col in SEARCH_COLUMNS)
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS logs_fts_insert AFTER INSERT ON logs BEGIN
+            INSERT INTO logs_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS logs_fts_delete AFTER DELETE ON logs BEGIN
+            INSERT INTO logs_fts(logs_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+        END''')
+        c.execute(f'''CREATE TRIGGER IF NOT EXISTS logs_fts_update AFTER UPDATE ON logs BEGIN
+            INSERT INTO logs_fts(logs_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            INSERT INTO logs_fts(rowid, {columns}) VALUES (new.id, {new_values});
+        END''')
+        c.execute("INSERT INTO logs_fts(logs_fts) VALUES ('rebuild')")
+    
+    def has_search_index(self):
+        c = self.conn.cursor()
+        c.execute("SELECT 1 FROM sqlite_master WHERE name='logs_fts'")
+        return c.fetchone() is not None
+    
+    def search_logs(self, text, limit=50):
+        # (날짜, 강조 표시된 HTML 조각) 목록을 관련도 순으로 반환합니다.
+        text = text.strip()
+        if not text:
+            return []
+        c = self.conn.cursor()
+        # trigram 색인은 3글자 이상부터 쓸 수 있어 짧은 검색어는 LIKE 로 찾습니다.
+        if len(text) >= 3 and self.has_search_index():
+            phrase = '"' + text.replace('"', '""') + '"'
+            c.execute('''SELECT logs.date,
+                                snippet(logs_fts, -1, char(2), char(3), '…', 16)
+                         FROM logs_fts JOIN logs ON logs.id = logs_fts.rowid
+                         WHERE logs_fts MATCH ? ORDER BY rank LIMIT ?''', (phrase, limit))
+            return [(log_date, html.escape(snippet.replace("\n", " ")).replace("\x02", "<b>").replace("\x03", "</b>"))
+                    for log_date, snippet in c.fetchall()]
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        where = " OR ".join(f"{col} LIKE ? ESCAPE '\\'" for col in SEARCH_COLUMNS)
+        c.execute(f"SELECT date, {', '.join(SEARCH_COLUMNS)} FROM logs WHERE {where} ORDER BY date DESC LIMIT ?",
+                  [pattern] * len(SEARCH_COLUMNS) + [limit])
+        results = []
+        for row in c.fetchall():
+            match = next((v for v in row[1:] if v and text.lower() in v.lower()), None)
+            if match is None:
+                continue
+            results.append((row[0], highlight_match(match, text)))
+        return results
+    
+    def save_log(self, log):
+        self.save_logs([log])
+    
+    def save_logs(self, logs, commit=True):
+        # 여러 날의 기록을 executemany 로 한 번에 씁니다. commit=False 이면 호출한 쪽에서 커밋/롤백합니다.
+        # 같은 날짜가 여러 번 있으면 마지막 기록만 씁니다 (logs 는 UPSERT 로 마지막 행만 남으므로 세션도 맞춥니다).
+        logs = list({log['date']: log for log in logs}.values())
+        log_rows = []
+        session_rows = []
+        for log in logs:
+            run_json = log['running_training'] or "[]"
+            log_rows.append((
+                log['date'],
+                log['running_training'],
+                log['strength_training'],
+                log['morning_heart_rate'],
+                log['fasting_weight'],
+                log['bedtime'],
+                log['wakeup_time'],
+                log['sleep_time'],
+                log['bowel'],
+                log['meal_breakfast'],
+                log['meal_lunch'],
+                log['meal_dinner'],
+                log['meal_snack'],
+                log['comment']
+            ) + compute_running_totals(run_json))
+            session_rows.extend((log['date'],) + row for row in running_session_rows(run_json))
+        c = self.conn.cursor()
+        c.executemany("DELETE FROM running_sessions WHERE log_date=?", [(log['date'],) for log in logs])
+        # 행을 지우고 다시 넣지 않고 UPSERT 로 갱신하므로 id 가 바뀌지 않습니다.
+        c.executemany('''
+            INSERT INTO logs (
+                date, running_training, strength_training, morning_heart_rate, fasting_weight,
+                bedtime, wakeup_time, sleep_time, bowel,
+                meal_breakfast, meal_lunch, meal_dinner, meal_snack, comment,
+                total_km, session_count, avg_pace_sec
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(date) DO UPDATE SET
+                running_training=excluded.running_training, strength_training=excluded.strength_training,
+                morning_heart_rate=excluded.morning_heart_rate, fasting_weight=excluded.fasting_weight,
+                bedtime=excluded.bedtime, wakeup_time=excluded.wakeup_time, sleep_time=excluded.sleep_time,
+                bowel=excluded.bowel, meal_breakfast=excluded.meal_breakfast, meal_lunch=excluded.meal_lunch,
+                meal_dinner=excluded.meal_dinner, meal_snack=excluded.meal_snack, comment=excluded.comment,
+                total_km=excluded.total_km, session_count=excluded.session_count, avg_pace_sec=excluded.avg_pace_sec
+        ''', log_rows)
+        c.executemany('''INSERT INTO running_sessions (log_date, position, type, m, count, value, km, pace_sec)
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', session_rows)
+        self.refresh_period_summaries([log['date'] for log in logs])
+        if commit:
+            self.conn.commit()
+            if len(logs) == 1:
+                self.notify_saved(logs[0]['date'], logs[0])
+            else:
+                self.notify_saved(None)
+    
+    def update_fields(self, log_date, fields):
+        # 바뀐 컬럼만 씁니다 (자동 저장용). 그날 기록이 없으면 새 행을 만듭니다.
+        columns = [name for name in LOG_FIELDS if name in fields]
+        if not columns:
+            return
+        run_json = fields.get("running_training") or "[]"
+        insert_columns = columns + ["total_km", "session_count", "avg_pace_sec"]
+        values = [fields[name] for name in columns] + list(compute_running_totals(run_json))
+        update_columns = columns + (["total_km", "session_count", "avg_pace_sec"] if "running_training" in fields else [])
+        c = self.conn.cursor()
+        c.execute(
+            f"INSERT INTO logs (date, {', '.join(insert_columns)}) VALUES ({', '.join('?' * (len(insert_columns) + 1))}) "
+            f"ON CONFLICT(date) DO UPDATE SET {', '.join(f'{name}=excluded.{name}' for name in update_columns)}",
+            [log_date] + values)
+        if "running_training" in fields:
+            c.execute("DELETE FROM running_sessions WHERE log_date=?", (log_date,))
+            c.executemany('''INSERT INTO running_sessions (log_date, position, type, m, count, value, km, pace_sec)
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                          [(log_date,) + row for row in running_session_rows(run_json)])
+        self.refresh_period_summaries([log_date])
+        self.conn.commit()
+        self.notify_saved(log_date, fields)
+    
+    @property
+    def metrics(self):
+        # 처음 쓸 때 한 번 전체를 읽어 MetricStore 를 만듭니다 (명령줄 도구, 이미지 내보내기 프로세스용).
+        if self.metric_store is None:
+            self.metric_store = self.build_metric_store()
+        return self.metric_store
+    
+    def build_metric_store(self, start_date=None, end_date=None):
+        # 읽기 스레드에서 호출해 만든 저장소를 메인 스레드의 DataManager 로 넘길 수 있도록 새로 만들어 반환합니다.
+        # 기간을 주면 그 기간만 담은 작은 저장소입니다 (MetricStore.load 참고).
+        store = MetricStore()
+        store.load(self.conn, start_date, end_date)
+        return store
+    
+    def notify_saved(self, log_date, fields=None):
+        # 리스너가 새 값을 보도록 수치 저장소를 먼저 고칩니다. 저장한 값(fields)을 모르거나 여러 날이 바뀌었으면
+        # 저장소를 버리고 다음에 쓸 때 다시 만듭니다.
+        if self.metric_store is not None:
+            if log_date is None or fields is None:
+                self.metric_store = None
+            else:
+                self.metric_store.update_day(log_date, fields)
+        for callback in self.save_listeners:
+            callback(log_date)
+    
+    def add_save_listener(self, callback):
+        # 저장된 날짜 문자열(yyyy-MM-dd)을 인자로 호출됩니다. 여러 날이 한꺼번에 바뀌면 None 입니다.
+        self.save_listeners.append(callback)
+    
+    def get_log_by_date(self, log_date):
+        c = self.conn.cursor()
+        c.execute(f"SELECT {LOG_COLUMNS} FROM logs WHERE date=?", (log_date,))
+        return c.fetchone()
+    
+    def get_logs_between(self, start_date, end_date):
+        c = self.conn.cursor()
+        c.execute(f"SELECT {LOG_COLUMNS} FROM logs WHERE date BETWEEN ? AND ? ORDER BY date", (start_date, end_date))
+        return c.fetchall()
+    
+    def get_day_records(self, start_date, end_date):
+        # 일간 입력 화면용. 입력 컬럼을 이름으로 담은 dict 목록이며, running_training 은 "sessions" 로 풀어 둡니다.
+        c = self.conn.cursor()
+        c.execute(f"SELECT date, {', '.join(LOG_FIELDS)} FROM logs WHERE date BETWEEN ? AND ? ORDER BY date",
+                  (start_date, end_date))
+        records = []
+        for row in c.fetchall():
+            record = dict(zip(["date"] + LOG_FIELDS, row))
+            try:
+                sessions = json.loads(record["running_training"] or "[]")
+            except ValueError:
+                sessions = []
+            record["sessions"] = sessions if isinstance(sessions, list) else []
+            records.append(record)
+        return records
+    
+    def get_day_summaries_between(self, start_date, end_date):
+        # (날짜, 총 거리, 몸무게, 수면 시간) - JSON 파싱 없이 저장된 합계 컬럼만 읽습니다.
+        c = self.conn.cursor()
+        c.execute('''SELECT date, total_km, fasting_weight, sleep_time FROM logs
+                     WHERE date BETWEEN ? AND ? ORDER BY date''', (start_date, end_date))
+        return c.fetchall()
+    
+    def get_total_km_between(self, start_date, end_date):
+        c = self.conn.cursor()
+        c.execute("SELECT COALESCE(SUM(total_km), 0) FROM logs WHERE date BETWEEN ? AND ?", (start_date, end_date))
+        return c.fetchone()[0]
+    
+    def get_running_sessions(self, log_date):
+        # RunningTrainingLine.to_dict 와 같은 형식(문자열 값)의 목록을 반환합니다.
+        c = self.conn.cursor()
+        c.execute('''SELECT type, m, count, value, pace_sec FROM running_sessions
+                     WHERE log_date=? ORDER BY position''', (log_date,))
+        sessions = []
+        for ttype, m, count, value, pace_sec in c.fetchall():
+            d = {"type": ttype}
+            if ttype in ["언덕 훈련", "인터벌"]:
+                d["m"] = str(m) if m is not None else ""
+                d["count"] = str(count) if count is not None else ""
+            else:
+                d["value"] = f"{value:g}" if value is not None else ""
+            d["pace_min"] = str(pace_sec // 60) if pace_sec is not None else ""
+            d["pace_sec"] = str(pace_sec % 60) if pace_sec is not None else ""
+            sessions.append(d)
+        return sessions
+    
+    def find_running_sessions(self, ttype=None, max_pace_sec=None, start_date=None, end_date=None):
+        # 예: find_running_sessions("인터벌", 210, "2025-01-01", "2025-12-31") -> 3'30'' 보다 빠른 올해 인터벌
+        query = "SELECT log_date, type, km, pace_sec FROM running_sessions WHERE 1=1"
+        params = []
+        if ttype is not None:
+            query += " AND type=?"
+            params.append(ttype)
+        if max_pace_sec is not None:
+            query += " AND pace_sec IS NOT NULL AND pace_sec < ?"
+            params.append(max_pace_sec)
+        if start_date is not None:
+            query += " AND log_date >= ?"
+            params.append(start_date)
+        if end_date is not None:
+            query += " AND log_date <= ?"
+            params.append(end_date)
+        query += " ORDER BY log_date, position"
+        c = self.conn.cursor()
+        c.execute(query, params)
+        return c.fetchall()
+    
+    def get_trends(self, start_date, end_date):
+        # analytics.trends_between 참고 - 날짜별 이동 평균/부하비/심박 편차/체중 추세
+        import analytics
+        try:
+            start = datetime.strptime(start_date, "%Y-%m-%d").date()
+            end = datetime.strptime(end_date, "%Y-%m-%d").date()
+        except:
+            return []
+        return analytics.trends_between(self.conn, start, end)
+    
+    def get_first_log_date(self):
+        c = self.conn.cursor()
+        c.execute("SELECT MIN(date) FROM logs")
+        return c.fetchone()[0]
+    
+    def get_week_block(self, start_date, end_date):
+        # 주간 표의 한 블록: (일지 목록, 날짜별 추세)
+        return self.get_logs_between(start_date, end_date), self.get_trends(start_date, end_date)
+    
+    def get_all_logs(self):
+        c = self.conn.cursor()
+        c.execute(f"SELECT {LOG_COLUMNS} FROM logs ORDER BY date")
+        return c.fetchall()
+    
+    def count_logs(self):
+        c = self.conn.cursor()
+        c.execute("SELECT COUNT(*) FROM logs")
+        return c.fetchone()[0]
+    
+    def iter_backup_rows(self, batch_size=500):
+        # 백업 파일 컬럼 순서(BACKUP_HEADER)대로 batch_size 행씩 읽어 전체를 메모리에 올리지 않습니다.
+        c = self.conn.cursor()
+        c.execute('''SELECT date, running_training, strength_training, morning_heart_rate, fasting_weight,
+                            bedtime, wakeup_time, sleep_time, bowel,
+                            meal_breakfast, meal_lunch, meal_dinner, meal_snack, comment
+                     FROM logs ORDER BY date''')
+        while True:
+            rows = c.fetchmany(batch_size)
+            if not rows:
+                break
+            yield rows
+    
+    def get_previous_weight(self, current_date):
+        # current_date 전에 마지막으로 잰 몸무게 (바로 전날이 비어 있어도 그 전 기록을 찾습니다).
+        return self.metrics.previous("fasting_weight", current_date)
+    
+    def get_activity_hashes(self):
+        c = self.conn.cursor()
+        c.execute("SELECT hash FROM activity_files")
+        return {row[0] for row in c.fetchall()}
+    
+    def get_activity_files(self, log_date):
+        # [(파일 이름, 시작 시각, km, 움직인 시간(초), km 구간 기록 [{"km", "sec"}])]
+        c = self.conn.cursor()
+        c.execute("""SELECT file_name, started_at, km, moving_sec, splits FROM activity_files
+                     WHERE log_date=? ORDER BY started_at""", (log_date,))
+        return [row[:4] + (json.loads(row[4] or "[]"),) for row in c.fetchall()]
+    
+    def add_activities(self, activities, activity_type):
+        # 활동 파일 요약(activity.summarize_activity)을 그날 러닝 세션 뒤에 덧붙이고,
+        # 파일 해시를 같은 트랜잭션에 기록합니다.
+        by_date = {}
+        for activity in sorted(activities, key=lambda a: a["started_at"]):
+            by_date.setdefault(activity["date"], []).append(activity)
+        logs = []
+        for log_date, items in by_date.items():
+            row = self.get_log_by_date(log_date)
+            if row is None:
+                log = {name: "" for name in LOG_FIELDS}
+                log.update(morning_heart_rate=0, fasting_weight=0, sleep_time=0.0)
+            else:
+                log = dict(zip(["id", "date"] + LOG_FIELDS, row))
+            log["date"] = log_date
+            try:
+                sessions = json.loads(log["running_training"] or "[]")
+            except ValueError:
+                sessions = []
+            for activity in items:
+                pace = round(activity["pace_sec"]) if activity["pace_sec"] else None
+                sessions.append({
+                    "type": activity_type,
+                    "value": f"{activity['km']:.2f}",
+                    "pace_min": str(pace // 60) if pace else "",
+                    "pace_sec": str(pace % 60) if pace else "",
+                })
+            log["running_training"] = json.dumps(sessions, ensure_ascii=False)
+            logs.append(log)
+        imported_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            self.save_logs(logs, commit=False)
+            self.conn.executemany('''INSERT OR IGNORE INTO activity_files
+                                       (hash, file_name, log_date, started_at, km, moving_sec, splits, imported_at)
+                                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                                  [(a["hash"], a["file"], a["date"], a["started_at"], a["km"], a["moving_sec"],
+                                    json.dumps(a["splits"]), imported_at) for a in activities])
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        if len(logs) == 1:
+            self.notify_saved(logs[0]["date"], logs[0])
+        else:
+            self.notify_saved(None)
+    
+    def get_stats(self, start_date=None, end_date=None):
+        # start_date ~ end_date (없으면 전체) 의 합계/평균을 한 번의 집계 쿼리로 구합니다.
+        query = '''SELECT COUNT(*), MIN(date), MAX(date),
+                          COALESCE(SUM(total_km), 0), COALESCE(SUM(total_km > 0), 0), COALESCE(SUM(session_count), 0),
+                          SUM(avg_pace_sec * total_km) / SUM(CASE WHEN avg_pace_sec > 0 THEN total_km END),
+                          AVG(NULLIF(morning_heart_rate, 0)), AVG(NULLIF(fasting_weight, 0)), AVG(NULLIF(sleep_time, 0))
+                   FROM logs WHERE date IS NOT NULL'''
+        params = []
+        if start_date is not None:
+            query += " AND date >= ?"
+            params.append(start_date)
+        if end_date is not None:
+            query += " AND date <= ?"
+            params.append(end_date)
+        c = self.conn.cursor()
+        c.execute(query, params)
+        keys = ["days", "first_date", "last_date", "total_km", "run_days", "session_count",
+                "avg_pace_sec", "avg_heart_rate", "avg_weight", "avg_sleep"]
+        return dict(zip(keys, c.fetchone()))
+    
+    def vacuum(self):
+        # 검색 색인을 합치고 DB 파일을 다시 써서 빈 페이지를 돌려줍니다.
+        # WAL 모드에서는 VACUUM 도 WAL 을 거쳐 쓰이므로 마지막에 체크포인트로 WAL 을 비웁니다.
+        c = self.conn.cursor()
+        if self.has_search_index():
+            c.execute("INSERT INTO logs_fts(logs_fts) VALUES ('optimize')")
+            self.conn.commit()
+        c.execute("VACUUM")
+        c.execute("PRAGMA optimize")
+        c.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+for method_name in [
+    "save_logs", "update_fields", "search_logs", "get_period_summaries", "get_log_by_date", "get_logs_between",
+    "get_day_records", "get_day_summaries_between", "get_total_km_between", "get_running_sessions",
+    "find_running_sessions", "get_trends", "get_first_log_date", "get_week_block", "get_all_logs", "count_logs",
+    "get_previous_weight", "get_stats", "build_metric_store",
+]:
+    setattr(DataManager, method_name, profiled(getattr(DataManager, method_name)))
+
+#########################
+# 러닝 트레이닝 파싱 함수
+#########################
+def parse_running_training_km(json_str):
+    try:
+        data = json.loads(json_str)
+    except:
+        data = []
+    results = []
+    total_km = 0.0
+    for item in data:
+        ttype = item.get("type", "")
+        km_val = 0.0
+        if ttype in ["언덕 훈련", "인터벌"]:
+            try:
+                m_val = float(item.get("m", "0"))
+                count = float(item.get("count", "0"))
+                km_val = (m_val * count) / 1000.0
+            except:
+                km_val = 0.0
+        else:
+            try:
+                km_val = float(item.get("value", "0"))
+            except:
+                km_val = 0.0
+        try:
+            pace_min = int(item.get("pace_min", "0").strip()) if item.get("pace_min", "").strip() else 0
+        except:
+            pace_min = 0
+        try:
+            pace_sec = int(item.get("pace_sec", "0").strip()) if item.get("pace_sec", "").strip() else 0
+        except:
+            pace_sec = 0
+        pace_str = f"{pace_min:02d}'{pace_sec:02d}''" if (pace_min or pace_sec) else ""
+        results.append((ttype, km_val, pace_str))
+        total_km += km_val
+    return results, total_km
+
+SEARCH_COLUMNS = ["comment", "strength_training", "meal_breakfast", "meal_lunch", "meal_dinner", "meal_snack"]
+
+def highlight_match(value, text, context=24):
+    # LIKE 검색 결과에 snippet() 과 같은 형식으로 일치 부분을 <b> 로 감쌉니다.
+    value = value.replace("\n", " ")
+    i = value.lower().find(text.lower())
+    start = max(i - context, 0)
+    end = min(i + len(text) + context, len(value))
+    return ("…" if start > 0 else "") + html.escape(value[start:i]) + "<b>" + html.escape(value[i:i + len(text)]) + "</b>" \
+        + html.escape(value[i + len(text):end]) + ("…" if end < len(value) else "")
+
+def period_buckets(d):
+    # 날짜 d 가 속한 (기간 종류, 키, 시작일, 끝일) 목록 - ISO 주, 월, 연
+    iso_year, iso_week, _ = d.isocalendar()
+    monday = d - timedelta(days=d.weekday())
+    month_start = d.replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return [
+        ("week", f"{iso_year}-W{iso_week:02d}", monday.strftime("%Y-%m-%d"), (monday + timedelta(days=6)).strftime("%Y-%m-%d")),
+        ("month", d.strftime("%Y-%m"), month_start.strftime("%Y-%m-%d"), month_end.strftime("%Y-%m-%d")),
+        ("year", d.strftime("%Y"), f"{d.year}-01-01", f"{d.year}-12-31"),
+    ]
+
+def to_number(text, cast):
+    try:
+        return cast(str(text).strip()) if str(text).strip() else None
+    except:
+        return None
+
+def running_session_rows(json_str):
+    # running_sessions 테이블용 (순서, 종류, m, 횟수, 거리값, km, 페이스(초/km)) 행 목록.
+    try:
+        data = json.loads(json_str)
+    except:
+        data = []
+    parsed, _ = parse_running_training_km(json_str)
+    rows = []
+    for position, (item, (ttype, km_val, _)) in enumerate(zip(data, parsed)):
+        pace_min = to_number(item.get("pace_min", ""), int)
+        pace_sec = to_number(item.get("pace_sec", ""), int)
+        pace = (pace_min or 0) * 60 + (pace_sec or 0) if (pace_min or pace_sec) else None
+        rows.append((
+            position, ttype,
+            to_number(item.get("m", ""), int),
+            to_number(item.get("count", ""), int),
+            to_number(item.get("value", ""), float),
+            km_val, pace
+        ))
+    return rows
+
+def compute_running_totals(json_str):
+    # 저장 시 함께 기록되는 (총 거리 km, 세션 수, 거리 가중 평균 페이스(초/km)).
+    results, total_km = parse_running_training_km(json_str)
+    pace_km = 0.0
+    pace_total = 0.0
+    for _, km_val, pace_str in results:
+        if pace_str and km_val > 0:
+            pace_min, pace_sec = pace_str.rstrip("'").split("'")
+            pace_total += (int(pace_min) * 60 + int(pace_sec)) * km_val
+            pace_km += km_val
+    avg_pace_sec = pace_total / pace_km if pace_km > 0 else None
+    return total_km, len(results), avg_pace_sec
+
+#########################
+# 백업 가져오기/내보내기 (xlsx, CSV, TSV, NDJSON)
+# - 가져오기: 엑셀은 read-only 스트리밍, 텍스트 형식은 한 줄씩 읽어 청크 단위 executemany 로 씁니다.
+#   전체 가져오기는 하나의 트랜잭션이며, 오류나 취소 시 롤백됩니다.
+# - 내보내기: 커서를 배치 단위로 읽어 바로 파일에 쓰므로 (엑셀은 write_only) 메모리 사용량이 일정합니다.
+#   실패하거나 취소되면 쓰던 파일을 지웁니다.
+# - progress(처리 수, 전체 수(모르면 0), 초당 처리 수), cancelled() 로 진행 상황을 알리고 취소를 확인합니다.
+#########################
+IMPORT_CHUNK_SIZE = 500
+
+def backup_cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+def backup_row_to_log(row):
+    row = tuple(row) + (None,) * (14 - len(row))
+    log_date = backup_cell_text(row[0]).strip()
+    datetime.strptime(log_date, "%Y-%m-%d")
+    return {
+        'date': log_date,
+        'running_training': row[1] if row[1] is not None else "",
+        'strength_training': row[2] if row[2] is not None else "",
+        'morning_heart_rate': int(float(row[3])) if row[3] is not None else 0,
+        'fasting_weight': int(float(row[4])) if row[4] is not None else 0,
+        'bedtime': row[5] if row[5] is not None else "",
+        'wakeup_time': row[6] if row[6] is not None else "",
+        'sleep_time': float(row[7]) if row[7] is not None else 0.0,
+        'bowel': row[8] if row[8] is not None else "",
+        'meal_breakfast': row[9] if row[9] is not None else "",
+        'meal_lunch': row[10] if row[10] is not None else "",
+        'meal_dinner': row[11] if row[11] is not None else "",
+        'meal_snack': row[12] if row[12] is not None else "",
+        'comment': row[13] if row[13] is not None else ""
+    }
+
+BACKUP_FORMATS = ["xlsx", "csv", "tsv", "ndjson"]
+BACKUP_HEADER = [
+    "날짜", "러닝 트레이닝(JSON)", "보강 트레이닝", "아침 심박수", "공복 몸무게",
+    "작일 취침 시각", "기상 시각", "수면 시간", "배변 여부",
+    "아침", "점심", "저녁", "간식", "코멘트"
+]
+# NDJSON 의 키 (BACKUP_HEADER 와 같은 순서)
+BACKUP_KEYS = ["date"] + LOG_FIELDS
+
+def backup_format(file_name, default="xlsx"):
+    ext = os.path.splitext(file_name)[1].lower().lstrip(".")
+    if ext == "jsonl":
+        return "ndjson"
+    return ext if ext in BACKUP_FORMATS else default
+
+def report_progress(progress, done, total, started):
+    if progress:
+        elapsed = time.perf_counter() - started
+        progress(done, total, done / elapsed if elapsed > 0 else 0.0)
+
+@contextmanager
+def backup_rows(file_name, file_format):
+    # (전체 행 수(모르면 0), (파일의 행 번호, BACKUP_HEADER 순서의 값 튜플) iterator)
+    if file_format == "xlsx":
+        import openpyxl
+        wb = openpyxl.load_workbook(file_name, read_only=True)
+        try:
+            ws = wb.active
+            yield max((ws.max_row or 1) - 1, 0), enumerate(ws.iter_rows(min_row=2, values_only=True), start=2)
+        finally:
+            wb.close()
+    elif file_format == "ndjson":
+        with open(file_name, encoding="utf-8-sig") as f:
+            yield 0, ndjson_rows(f)
+    else:
+        with open(file_name, newline="", encoding="utf-8-sig") as f:
+            reader = csv.reader(f, delimiter="\t" if file_format == "tsv" else ",")
+            next(reader, None)
+            # 텍스트 형식에서는 빈 칸을 값이 없는 것으로 봅니다.
+            yield 0, ((n, tuple(v if v != "" else None for v in row)) for n, row in enumerate(reader, start=2))
+
+def ndjson_rows(f):
+    for row_number, line in enumerate(f, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"{row_number}행: {e}")
+        if not isinstance(record, dict):
+            raise ValueError(f"{row_number}행: JSON 객체가 아닙니다")
+        yield row_number, tuple(record.get(key) for key in BACKUP_KEYS)
+
+def import_backup(data_manager, file_name, file_format=None, progress=None, cancelled=lambda: False):
+    # 가져온 행 수를 반환합니다. 취소되면 롤백하고, 오류가 나면 롤백한 뒤 예외를 다시 던집니다.
+    # 파일에 같은 날짜가 여러 번 있으면 뒤의 행이 앞의 행을 덮어씁니다 (묶음 안에서도, 묶음 사이에서도).
+    file_format = file_format or backup_format(file_name)
+    started = time.perf_counter()
+    imported = 0
+    chunk = []
+    try:
+        with backup_rows(file_name, file_format) as (total, rows):
+            for row_number, row in rows:
+                if cancelled():
+                    break
+                if not row or all(v is None for v in row):
+                    continue
+                try:
+                    chunk.append(backup_row_to_log(row))
+                except Exception as e:
+                    raise ValueError(f"{row_number}행: {e}")
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    data_manager.save_logs(chunk, commit=False)
+                    imported += len(chunk)
+                    chunk = []
+                    report_progress(progress, imported, total, started)
+            if chunk and not cancelled():
+                data_manager.save_logs(chunk, commit=False)
+                imported += len(chunk)
+                report_progress(progress, imported, total, started)
+        if cancelled():
+            data_manager.conn.rollback()
+        else:
+            data_manager.conn.commit()
+    except Exception:
+        data_manager.conn.rollback()
+        raise
+    return imported
+
+def export_backup(data_manager, file_name, file_format=None, progress=None, cancelled=lambda: False):
+    # 내보낸 행 수를 반환합니다. 오류가 나거나 취소되면 쓰던 파일을 지웁니다.
+    file_format = file_format or backup_format(file_name)
+    started = time.perf_counter()
+    total = data_manager.count_logs()
+    exported = 0
+
+    def batches():
+        nonlocal exported
+        for rows in data_manager.iter_backup_rows():
+            if cancelled():
+                return
+            yield rows
+            exported += len(rows)
+            report_progress(progress, exported, total, started)
+
+    try:
+        if file_format == "xlsx":
+            write_backup_xlsx(file_name, batches())
+        elif file_format == "ndjson":
+            write_backup_ndjson(file_name, batches())
+        else:
+            write_backup_csv(file_name, batches(), "\t" if file_format == "tsv" else ",")
+    except BaseException:
+        remove_file(file_name)
+        raise
+    if cancelled():
+        remove_file(file_name)
+    return exported
+
+def write_backup_xlsx(file_name, batches):
+    import openpyxl
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Backup")
+    ws.append(BACKUP_HEADER)
+    for rows in batches:
+        for row in rows:
+            ws.append(list(row))
+    wb.save(file_name)
+
+def write_backup_csv(file_name, batches, delimiter=","):
+    # 엑셀에서 한글이 깨지지 않도록 BOM 을 붙입니다.
+    with open(file_name, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=delimiter)
+        writer.writerow(BACKUP_HEADER)
+        for rows in batches:
+            writer.writerows(rows)
+
+def write_backup_ndjson(file_name, batches):
+    # 한 줄에 하루씩, 키는 logs 컬럼 이름입니다.
+    with open(file_name, "w", encoding="utf-8") as f:
+        for rows in batches:
+            f.writelines(json.dumps(dict(zip(BACKUP_KEYS, row)), ensure_ascii=False) + "\n" for row in rows)
+
+def remove_file(file_name):
+    try:
+        os.remove(file_name)
+    except OSError:
+        pass
+
+#########################
+# DB 스냅샷 (자동 백업)
+# - SQLite 온라인 백업 API 로 실행 중인 DB 를 작은 페이지 단위로 복사하므로 저장 작업을 오래 막지 않습니다.
+# - 스냅샷은 integrity_check 로 검사한 뒤 gzip 으로 압축해 backups 폴더에 두고, 일/주/월 단위로 정리합니다.
+#########################
+SNAPSHOT_PREFIX = "training_log-"
+SNAPSHOT_SUFFIX = ".db.gz"
+SNAPSHOT_INTERVAL = timedelta(days=1)
+SNAPSHOT_PAGES_PER_STEP = 64
+SNAPSHOT_STEP_SLEEP = 0.005
+RESTORE_PAGES_PER_STEP = 1024
+# (일별, 주별, 월별) 로 남길 스냅샷 수
+SNAPSHOT_RETENTION = (7, 4, 12)
+
+def backup_dir():
+    path = os.path.join(data_dir(), "backups")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def snapshot_time(file_name):
+    name = os.path.basename(file_name)
+    if not (name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)):
+        return None
+    try:
+        return datetime.strptime(name[len(SNAPSHOT_PREFIX):-len(SNAPSHOT_SUFFIX)], "%Y%m%d-%H%M%S")
+    except ValueError:
+        return None
+
+def list_snapshots(directory=None):
+    # [(생성 시각, 경로)], 최신순
+    directory = directory or backup_dir()
+    snapshots = []
+    for name in os.listdir(directory):
+        taken = snapshot_time(name)
+        if taken is not None:
+            snapshots.append((taken, os.path.join(directory, name)))
+    snapshots.sort(reverse=True)
+    return snapshots
+
+def check_integrity(conn):
+    result = conn.execute("PRAGMA integrity_check").fetchall()
+    if result != [("ok",)]:
+        raise sqlite3.DatabaseError("무결성 검사 실패: " + "; ".join(str(row[0]) for row in result[:5]))
+
+def create_snapshot(db_path, directory=None, now=None):
+    directory = directory or backup_dir()
+    now = now or datetime.now()
+    final_path = os.path.join(directory, SNAPSHOT_PREFIX + now.strftime("%Y%m%d-%H%M%S") + SNAPSHOT_SUFFIX)
+    while os.path.exists(final_path):
+        now += timedelta(seconds=1)
+        final_path = os.path.join(directory, SNAPSHOT_PREFIX + now.strftime("%Y%m%d-%H%M%S") + SNAPSHOT_SUFFIX)
+    raw_path = final_path + ".db.tmp"
+    gz_path = final_path + ".tmp"
+    try:
+        source = connect_database(db_path, read_only=True)
+        target = sqlite3.connect(raw_path)
+        try:
+            # 단계 사이에 잠깐 쉬어 그동안 앱의 저장이 끼어들 수 있게 합니다.
+            source.backup(target, pages=SNAPSHOT_PAGES_PER_STEP, sleep=SNAPSHOT_STEP_SLEEP)
+            # WAL 파일 없이 파일 하나로 완결되도록 저널 모드를 되돌립니다.
+            target.execute("PRAGMA journal_mode = DELETE")
+            check_integrity(target)
+        finally:
+            target.close()
+            source.close()
+        with open(raw_path, "rb") as src, gzip.open(gz_path, "wb", compresslevel=6) as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(gz_path, final_path)
+    finally:
+        for path in (raw_path, gz_path):
+            if os.path.exists(path):
+                os.remove(path)
+    return final_path
+
+def prune_snapshots(directory=None, retention=SNAPSHOT_RETENTION):
+    # 최신순으로 보면서 각 날짜/ISO 주/달의 가장 최근 스냅샷을 정해진 개수만큼 남기고 나머지는 지웁니다.
+    snapshots = list_snapshots(directory)
+    periods = (
+        (retention[0], lambda t: t.date()),
+        (retention[1], lambda t: tuple(t.isocalendar())[:2]),
+        (retention[2], lambda t: (t.year, t.month)),
+    )
+    keep = set()
+    for limit, period_of in periods:
+        seen = set()
+        for taken, path in snapshots:
+            period = period_of(taken)
+            if period in seen:
+                continue
+            if len(seen) >= limit:
+                break
+            seen.add(period)
+            keep.add(path)
+    removed = []
+    for taken, path in snapshots:
+        if path not in keep:
+            os.remove(path)
+            removed.append(path)
+    return removed
+
+#########################
+# 선수 등록부 (여러 선수)
+# - 선수마다 DB 파일을 따로 두고, 이름과 DB 파일 위치는 데이터 폴더의 athletes.db 에 기록합니다.
+# - 처음 만들 때는 기존 training_log.db 를 첫 번째 선수로 등록하므로 혼자 쓰던 기록이 그대로 이어집니다.
+#########################
+REGISTRY_FILE_NAME = "athletes.db"
+ATHLETE_DIR_NAME = "athletes"
+DEFAULT_ATHLETE_NAME = "나"
+
+def registry_path():
+    # 데이터 폴더를 만들지 않고 등록부 파일 경로만 구합니다 (있는지 확인할 때).
+    return os.path.join(data_dir(create=False), REGISTRY_FILE_NAME)
+
+class AthleteRegistry:
+    def __init__(self, path=None, read_only=False):
+        self.path = path or registry_path()
+        self.base_dir = os.path.dirname(os.path.abspath(self.path))
+        if read_only:
+            # 이름으로 DB 를 찾기만 할 때(cli --athlete)는 등록부를 만들거나 고치지 않습니다.
+            uri = "file:" + pathname2url(os.path.abspath(self.path)) + "?mode=ro"
+            self.conn = sqlite3.connect(uri, uri=True, timeout=10)
+            return
+        os.makedirs(self.base_dir, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=10)
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS athletes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            db_file TEXT NOT NULL,
+            last_opened TEXT
+        )''')
+        if self.conn.execute("SELECT COUNT(*) FROM athletes").fetchone()[0] == 0:
+            self.conn.execute("INSERT INTO athletes (name, db_file) VALUES (?, ?)", (DEFAULT_ATHLETE_NAME, DB_FILE_NAME))
+        self.conn.commit()
+        # 새로 설치해 기본 DB 가 아직 없으면 add() 처럼 DataManager 로 열어 스키마와 마이그레이션까지 마쳐 둡니다
+        # (예전 위치의 DB 를 복사해 온 경우도 포함). 그래야 팀 집계가 읽기 전용으로 붙일 수 있습니다.
+        if (not os.path.exists(os.path.join(self.base_dir, DB_FILE_NAME))
+                and self.conn.execute("SELECT 1 FROM athletes WHERE db_file=?", (DB_FILE_NAME,)).fetchone()):
+            DataManager(self.db_path(DB_FILE_NAME)).conn.close()
+
+    def db_path(self, db_file):
+        # db_file 은 데이터 폴더 기준 상대 경로입니다. 기본 DB 는 예전 위치에서 옮겨 오는 처리를 거칩니다.
+        if db_file == DB_FILE_NAME and self.base_dir == os.path.abspath(data_dir()):
+            return default_db_path()
+        return os.path.join(self.base_dir, db_file)
+
+    def athletes(self):
+        # [(id, 이름, DB 경로)], 등록 순서
+        rows = self.conn.execute("SELECT id, name, db_file FROM athletes ORDER BY id").fetchall()
+        return [(athlete_id, name, self.db_path(db_file)) for athlete_id, name, db_file in rows]
+
+    def get(self, athlete_id):
+        row = self.conn.execute("SELECT id, name, db_file FROM athletes WHERE id=?", (athlete_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"등록되지 않은 선수입니다: {athlete_id}")
+        return row[0], row[1], self.db_path(row[2])
+
+    def find(self, name):
+        row = self.conn.execute("SELECT id FROM athletes WHERE name=?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(f"등록되지 않은 선수입니다: {name}")
+        return row[0]
+
+    def add(self, name):
+        name = name.strip()
+        if not name:
+            raise ValueError("선수 이름을 입력하세요")
+        c = self.conn.cursor()
+        try:
+            c.execute("INSERT INTO athletes (name, db_file) VALUES (?, '')", (name,))
+        except sqlite3.IntegrityError:
+            self.conn.rollback()
+            raise ValueError(f"이미 등록된 이름입니다: {name}")
+        athlete_id = c.lastrowid
+        db_file = os.path.join(ATHLETE_DIR_NAME, f"athlete-{athlete_id}.db")
+        c.execute("UPDATE athletes SET db_file=? WHERE id=?", (db_file, athlete_id))
+        os.makedirs(os.path.join(self.base_dir, ATHLETE_DIR_NAME), exist_ok=True)
+        # 팀 집계가 읽기 전용으로 붙일 수 있도록 스키마를 미리 만들어 둡니다.
+        DataManager(self.db_path(db_file)).conn.close()
+        self.conn.commit()
+        return athlete_id
+
+    def rename(self, athlete_id, name):
+        name = name.strip()
+        if not name:
+            raise ValueError("선수 이름을 입력하세요")
+        self.get(athlete_id)
+        try:
+            self.conn.execute("UPDATE athletes SET name=? WHERE id=?", (name, athlete_id))
+            self.conn.commit()
+        except sqlite3.IntegrityError:
+            self.conn.rollback()
+            raise ValueError(f"이미 등록된 이름입니다: {name}")
+
+    def remove(self, athlete_id):
+        # 등록만 지우고 DB 파일은 남겨 둡니다. 앱이 열 선수가 있어야 하므로 마지막 한 명은 지울 수 없습니다.
+        self.get(athlete_id)
+        if self.conn.execute("SELECT COUNT(*) FROM athletes").fetchone()[0] <= 1:
+            raise ValueError("마지막 남은 선수는 지울 수 없습니다")
+        self.conn.execute("DELETE FROM athletes WHERE id=?", (athlete_id,))
+        self.conn.commit()
+
+    def touch(self, athlete_id):
+        self.conn.execute("UPDATE athletes SET last_opened=? WHERE id=?",
+                          (datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"), athlete_id))
+        self.conn.commit()
+
+    def last_opened(self):
+        row = self.conn.execute("SELECT id FROM athletes ORDER BY last_opened IS NULL, last_opened DESC, id LIMIT 1").fetchone()
+        return row[0]
+
+    def backup_dir(self, athlete_id):
+        # 첫 번째 선수(기존 DB)는 예전처럼 backups 폴더에, 나머지는 선수별 하위 폴더에 스냅샷을 둡니다.
+        _, _, db_path = self.get(athlete_id)
+        if os.path.basename(db_path) == DB_FILE_NAME:
+            return backup_dir()
+        path = os.path.join(backup_dir(), os.path.splitext(os.path.basename(db_path))[0])
+        os.makedirs(path, exist_ok=True)
+        return path
+
+#########################
+# 팀 집계
+# - 선수 DB 를 TEAM_ATTACH_BATCH 개씩 하나의 메모리 연결에 읽기 전용으로 ATTACH 하고, UNION ALL 쿼리 한 번으로 묶음을 읽습니다.
+# - 묶음마다 작업 스레드 하나가 맡으므로 (sqlite3 는 쿼리 중 GIL 을 놓습니다) 선수가 수십 명이어도 몇 번의 쿼리로 끝납니다.
+# - 주간 거리는 저장할 때 갱신되는 period_summaries 를, 아침 심박 경고는 최근 7일과 그 전 28일 평균을 비교합니다.
+#########################
+TEAM_ATTACH_BATCH = 8
+TEAM_WORKERS = 4
+HR_RECENT_DAYS = 7
+HR_BASELINE_DAYS = 28
+HR_ALERT_BPM = 5
+
+def week_key(d):
+    return period_buckets(d)[0][1]
+
+def team_batch(batch, first_week, last_week, today):
+    # batch: [(선수 id, DB 경로)] -> ({선수 id: {주 키: (거리, 러닝일)}}, {선수 id: (최근 평균, 기준 평균)})
+    recent_start = (today - timedelta(days=HR_RECENT_DAYS - 1)).strftime("%Y-%m-%d")
+    baseline_start = (today - timedelta(days=HR_RECENT_DAYS + HR_BASELINE_DAYS - 1)).strftime("%Y-%m-%d")
+    baseline_end = (today - timedelta(days=HR_RECENT_DAYS)).strftime("%Y-%m-%d")
+    today_str = today.strftime("%Y-%m-%d")
+    conn = sqlite3.connect("file::memory:", uri=True)
+    try:
+        mileage_parts, hr_parts, params, hr_params = [], [], [], []
+        for i, (athlete_id, db_path) in enumerate(batch):
+            conn.execute(f"ATTACH DATABASE ? AS a{i}", ("file:" + pathname2url(os.path.abspath(db_path)) + "?mode=ro",))
+            mileage_parts.append(f'''SELECT ?, period_key, total_km, run_days FROM a{i}.period_summaries
+                                     WHERE period_type='week' AND period_key BETWEEN ? AND ?''')
+            params += [athlete_id, first_week, last_week]
+            hr_parts.append(f'''SELECT ?,
+                (SELECT AVG(NULLIF(morning_heart_rate, 0)) FROM a{i}.logs WHERE date BETWEEN ? AND ?),
+                (SELECT AVG(NULLIF(morning_heart_rate, 0)) FROM a{i}.logs WHERE date BETWEEN ? AND ?)''')
+            hr_params += [athlete_id, recent_start, today_str, baseline_start, baseline_end]
+        mileage = {athlete_id: {} for athlete_id, _ in batch}
+        for athlete_id, key, km, run_days in conn.execute(" UNION ALL ".join(mileage_parts), params):
+            mileage[athlete_id][key] = (km, run_days)
+        heart_rate = {row[0]: row[1:] for row in conn.execute(" UNION ALL ".join(hr_parts), hr_params)}
+        return mileage, heart_rate
+    finally:
+        conn.close()
+
+def aggregate_team(athletes, weeks=8, today=None, workers=TEAM_WORKERS, batch_size=TEAM_ATTACH_BATCH):
+    # athletes: [(id, 이름, DB 경로)]
+    # 반환: {"weeks": [주 키, 과거순], "mileage": {id: {주 키: km}}, "run_days": {id: {주 키: 일수}},
+    #        "team_km": {주 키: km}, "heart_rate": {id: (최근 평균, 기준 평균)}, "alerts": [(id, 최근, 기준, 차이)],
+    #        "errors": {id: 오류 메시지}}
+    today = today or date.today()
+    monday = today - timedelta(days=today.weekday())
+    week_keys = [week_key(monday - timedelta(weeks=n)) for n in range(weeks - 1, -1, -1)]
+    report = {"weeks": week_keys, "mileage": {}, "run_days": {}, "team_km": dict.fromkeys(week_keys, 0.0),
+              "heart_rate": {}, "alerts": [], "errors": {}}
+    entries = [(athlete_id, db_path) for athlete_id, _, db_path in athletes]
+    batches = [entries[i:i + batch_size] for i in range(0, len(entries), batch_size)]
+
+    def run(batch):
+        try:
+            return [team_batch(batch, week_keys[0], week_keys[-1], today)]
+        except sqlite3.Error:
+            # 묶음 중 한 DB 가 문제이면 선수별로 다시 읽어 나머지 선수는 집계에 넣습니다.
+            results = []
+            for entry in batch:
+                try:
+                    results.append(team_batch([entry], week_keys[0], week_keys[-1], today))
+                except sqlite3.Error as e:
+                    report["errors"][entry[0]] = str(e)
+            return results
+
+    if batches:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(batches)))) as executor:
+            for results in executor.map(run, batches):
+                for mileage, heart_rate in results:
+                    for athlete_id, weeks_data in mileage.items():
+                        report["mileage"][athlete_id] = {key: km for key, (km, _) in weeks_data.items()}
+                        report["run_days"][athlete_id] = {key: days for key, (_, days) in weeks_data.items()}
+                        for key, (km, _) in weeks_data.items():
+                            report["team_km"][key] += km or 0
+                    report["heart_rate"].update(heart_rate)
+    for athlete_id, _, _ in athletes:
+        recent, baseline = report["heart_rate"].get(athlete_id, (None, None))
+        if recent is not None and baseline is not None and recent - baseline >= HR_ALERT_BPM:
+            report["alerts"].append((athlete_id, recent, baseline, recent - baseline))
+    report["alerts"].sort(key=lambda alert: -alert[3])
+    return report
@@ -4,7 +4,7 @@ APP = ['app.py']
 DATA_FILES = []
 OPTIONS = {
     'argv_emulation': True,
-    'packages': ['PyQt5', 'openpyxl'],
+    'packages': ['PyQt5', 'openpyxl', 'numpy'],
     'includes': [
         'sip',
         'PyQt5.sip',